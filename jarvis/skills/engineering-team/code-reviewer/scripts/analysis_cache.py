@@ -0,0 +1,150 @@
+"""
+Analysis Cache
+
+JSON helpers and the best-effort on-disk result cache shared by
+pr_analyzer.py and code_quality_checker.py. Entries live under
+$XDG_CACHE_HOME (default ~/.cache), one directory per script, and are
+evicted by age and by the total size of the directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Entries older than this are deleted when the cache is pruned
+CACHE_MAX_AGE = 30 * 24 * 3600
+
+# Oldest entries are deleted until a cache directory is under this size
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# A cache directory is pruned at most this often, across all processes
+CACHE_PRUNE_INTERVAL = 3600
+
+# Touched on every prune; its mtime throttles the next one
+PRUNE_MARKER = ".pruned"
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode()
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=None)
+def get_cache_dir(name: str) -> Optional[Path]:
+    """
+    Return the cache directory for one script, or None if there is no usable
+    home or cache directory (e.g. HOME unset and no passwd entry).
+    """
+    try:
+        root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(root) / name
+    except Exception:
+        return None
+
+
+def cache_entry(name: str, key: str) -> Optional[Path]:
+    """Return the cache entry for a key, or None if caching is unavailable."""
+    cache_dir = get_cache_dir(name)
+    if cache_dir is None:
+        return None
+    return cache_dir / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+
+def read_cache(cache_path: Path) -> Optional[Any]:
+    """Return a stored result, or None if it is missing or unreadable."""
+    try:
+        return json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(cache_path: Path, result: Any) -> None:
+    """Atomically store a result; caching is best-effort and never fails the analysis."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json_dumps(result))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+    maybe_prune_cache(cache_path.parent)
+
+
+@lru_cache(maxsize=None)
+def maybe_prune_cache(cache_dir: Path) -> None:
+    """
+    Prune a cache directory unless some process did so within
+    CACHE_PRUNE_INTERVAL. Memoized, so each process checks at most once.
+    """
+    marker = cache_dir / PRUNE_MARKER
+    try:
+        if time.time() - marker.stat().st_mtime < CACHE_PRUNE_INTERVAL:
+            return
+    except OSError:
+        pass
+    try:
+        marker.touch()
+    except OSError:
+        return
+    prune_cache(cache_dir)
+
+
+def prune_cache(cache_dir: Path) -> None:
+    """Delete entries older than CACHE_MAX_AGE, then the oldest beyond CACHE_MAX_BYTES."""
+    cutoff = time.time() - CACHE_MAX_AGE
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name == PRUNE_MARKER:
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                # Leftover temporary files from interrupted writes age out too
+                if st.st_mtime < cutoff:
+                    _unlink(entry.path)
+                else:
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    if total <= CACHE_MAX_BYTES:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        _unlink(path)
+        total -= size
+        if total <= CACHE_MAX_BYTES:
+            break
+
+
+def _unlink(path: str) -> None:
+    """Remove a file, ignoring one that another process removed first."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
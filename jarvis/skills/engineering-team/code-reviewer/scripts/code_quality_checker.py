@@ -12,11 +12,17 @@ Usage:
 """
 
 import argparse
-import json
+import ast
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from analysis_cache import cache_entry, get_cache_dir, json_dumps, read_cache, write_cache
 
 
 # Language-specific file extensions
@@ -29,6 +35,13 @@ LANGUAGE_EXTENSIONS = {
     "kotlin": [".kt", ".kts"]
 }
 
+# Reverse lookup so language detection is a single dict access per file
+EXTENSION_LANGUAGES = {
+    ext: lang
+    for lang, extensions in LANGUAGE_EXTENSIONS.items()
+    for ext in extensions
+}
+
 # Code smell thresholds
 THRESHOLDS = {
     "long_function_lines": 50,
@@ -38,6 +51,89 @@ THRESHOLDS = {
     "max_imports": 15
 }
 
+# Quality score deductions by severity
+SMELL_PENALTIES = {"high": 10, "medium": 5, "low": 2}
+VIOLATION_PENALTIES = {"high": 8, "medium": 4, "low": 2}
+
+# Directories pruned from directory scans
+EXCLUDED_DIRS = {"node_modules", ".git", "__pycache__", "dist", "build", "venv", ".venv"}
+
+# Per-file results are cached under this name, keyed on path, mtime and size
+CACHE_NAME = "code_quality_checker"
+
+# Changes to this script invalidate every cached result
+CHECKER_STAMP = os.stat(__file__).st_mtime_ns
+
+# Below this many files, process pool start-up costs more than it saves
+PARALLEL_ANALYSIS_THRESHOLD = 32
+
+# All patterns are bytes patterns: sources are analyzed as raw bytes and only
+# the names and numbers that end up in the report are decoded.
+
+# Control flow keywords that increase cyclomatic complexity, fused into one
+# alternation. The lookahead on the possible first letters lets the regex
+# engine reject most word boundaries before trying any alternative. "else"
+# is not a decision point (an "else if" is counted by its "if").
+COMPLEXITY_PATTERN = re.compile(
+    rb"\b(?=[iefwcao])(?:if|elif|for|while|case|catch|except|and|or)\b",
+    re.IGNORECASE
+)
+
+# Logical operators that increase complexity, counted with bytes.count
+COMPLEXITY_OPERATORS = (b"||", b"&&")
+
+# Language-specific function patterns
+FUNCTION_PATTERNS = {
+    lang: re.compile(pattern, re.MULTILINE)
+    for lang, pattern in {
+        "python": rb"def\s+(\w+)\s*\(([^)]*)\)",
+        "typescript": rb"(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>)",
+        "javascript": rb"(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>)",
+        "go": rb"func\s+(?:\([^)]+\)\s+)?(\w+)\s*\(([^)]*)\)",
+        "swift": rb"func\s+(\w+)\s*\(([^)]*)\)",
+        "kotlin": rb"fun\s+(\w+)\s*\(([^)]*)\)"
+    }.items()
+}
+
+# Language-specific class patterns
+CLASS_PATTERNS = {
+    lang: re.compile(pattern)
+    for lang, pattern in {
+        "python": rb"class\s+(\w+)",
+        "typescript": rb"class\s+(\w+)",
+        "javascript": rb"class\s+(\w+)",
+        "go": rb"type\s+(\w+)\s+struct",
+        "swift": rb"class\s+(\w+)",
+        "kotlin": rb"class\s+(\w+)"
+    }.items()
+}
+
+# Language-specific method patterns, matched within a class body
+METHOD_PATTERNS = {
+    lang: re.compile(pattern)
+    for lang, pattern in {
+        "python": rb"def\s+\w+\s*\(",
+        "typescript": rb"(?:public|private|protected)?\s*\w+\s*\([^)]*\)\s*[:{]",
+        "javascript": rb"\w+\s*\([^)]*\)\s*\{",
+        "go": rb"func\s+\(",
+        "swift": rb"func\s+\w+",
+        "kotlin": rb"fun\s+\w+"
+    }.items()
+}
+
+# Whole-content line classifiers; [^\S\n] is whitespace other than the line break
+BLANK_LINE_PATTERN = re.compile(rb"^[^\S\n]*$", re.MULTILINE)
+COMMENT_LINE_PATTERN = re.compile(rb"^[^\S\n]*(?:#|//|/\*|'''|\"\"\")", re.MULTILINE)
+
+MAGIC_NUMBER_PATTERN = re.compile(rb"\b(?<![.\"\'])\d{3,}\b(?!\.\d)")
+# Matched against left-stripped lines that already start with a comment marker
+COMMENTED_CODE_PATTERN = re.compile(
+    rb"[#/]+\s*(if|for|while|def|function|class|const|let|var)\s", re.IGNORECASE
+)
+TYPE_CHECK_PATTERN = re.compile(rb"isinstance\(|type\(.*\)\s*==|typeof\s+\w+\s*===")
+NOT_IMPLEMENTED_PATTERN = re.compile(rb"raise\s+NotImplementedError|not\s+implemented", re.IGNORECASE)
+IMPORT_PATTERN = re.compile(rb"^(?:import|from)\s+", re.MULTILINE)
+
 
 def get_file_extension(filepath: Path) -> str:
     """Get file extension."""
@@ -46,64 +142,46 @@ def get_file_extension(filepath: Path) -> str:
 
 def detect_language(filepath: Path) -> Optional[str]:
     """Detect programming language from file extension."""
-    ext = get_file_extension(filepath)
-    for lang, extensions in LANGUAGE_EXTENSIONS.items():
-        if ext in extensions:
-            return lang
-    return None
+    return EXTENSION_LANGUAGES.get(get_file_extension(filepath))
 
 
-def read_file_content(filepath: Path) -> str:
-    """Read file content safely."""
+def read_file_content(filepath: Path) -> bytes:
+    """Read file content safely, as bytes with universal newlines."""
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
+        content = filepath.read_bytes()
     except Exception:
-        return ""
+        return b""
+
+    if b"\r" in content:
+        content = content.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return content
+
 
+def decode(raw: bytes) -> str:
+    """Decode a matched fragment for the report."""
+    return raw.decode("utf-8", "replace")
 
-def calculate_cyclomatic_complexity(content: str) -> int:
+
+def calculate_cyclomatic_complexity(content: bytes, start: int = 0, end: Optional[int] = None) -> int:
     """
     Estimate cyclomatic complexity based on control flow keywords.
+
+    Only content[start:end] is scanned, without copying that slice.
     """
+    if end is None:
+        end = len(content)
     complexity = 1  # Base complexity
-
-    # Control flow patterns that increase complexity
-    patterns = [
-        r"\bif\b",
-        r"\belif\b",
-        r"\belse\b",
-        r"\bfor\b",
-        r"\bwhile\b",
-        r"\bcase\b",
-        r"\bcatch\b",
-        r"\bexcept\b",
-        r"\band\b",
-        r"\bor\b",
-        r"\|\|",
-        r"&&"
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        complexity += len(matches)
-
+    complexity += len(COMPLEXITY_PATTERN.findall(content, start, end))
+    for operator in COMPLEXITY_OPERATORS:
+        complexity += content.count(operator, start, end)
     return complexity
 
 
-def count_lines(content: str) -> Dict[str, int]:
+def count_lines(content: bytes) -> Dict[str, int]:
     """Count different types of lines in code."""
-    lines = content.split("\n")
-    total = len(lines)
-    blank = sum(1 for line in lines if not line.strip())
-    comment = 0
-
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("#") or stripped.startswith("//"):
-            comment += 1
-        elif stripped.startswith("/*") or stripped.startswith("'''") or stripped.startswith('"""'):
-            comment += 1
+    total = content.count(b"\n") + 1
+    blank = len(BLANK_LINE_PATTERN.findall(content))
+    comment = len(COMMENT_LINE_PATTERN.findall(content))
 
     code = total - blank - comment
 
@@ -115,43 +193,30 @@ def count_lines(content: str) -> Dict[str, int]:
     }
 
 
-def find_functions(content: str, language: str) -> List[Dict]:
+def find_functions(content: bytes, language: str) -> List[Dict]:
     """Find function definitions and their metrics."""
     functions = []
 
-    # Language-specific function patterns
-    patterns = {
-        "python": r"def\s+(\w+)\s*\(([^)]*)\)",
-        "typescript": r"(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>)",
-        "javascript": r"(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>)",
-        "go": r"func\s+(?:\([^)]+\)\s+)?(\w+)\s*\(([^)]*)\)",
-        "swift": r"func\s+(\w+)\s*\(([^)]*)\)",
-        "kotlin": r"fun\s+(\w+)\s*\(([^)]*)\)"
-    }
+    pattern = FUNCTION_PATTERNS.get(language, FUNCTION_PATTERNS["python"])
+    matches = list(pattern.finditer(content))
 
-    pattern = patterns.get(language, patterns["python"])
-    matches = re.finditer(pattern, content, re.MULTILINE)
-
-    for match in matches:
-        name = next((g for g in match.groups() if g), "anonymous")
-        params_str = match.group(2) if len(match.groups()) > 1 and match.group(2) else ""
+    for i, match in enumerate(matches):
+        name = next((decode(g) for g in match.groups() if g), "anonymous")
+        params_str = match.group(2) if len(match.groups()) > 1 and match.group(2) else b""
 
         # Count parameters
-        params = [p.strip() for p in params_str.split(",") if p.strip()]
+        params = [p.strip() for p in params_str.split(b",") if p.strip()]
         param_count = len(params)
 
-        # Estimate function length
+        # Estimate function length: the body runs until the next function
         start_pos = match.end()
-        remaining = content[start_pos:]
-
-        next_func = re.search(pattern, remaining)
-        if next_func:
-            func_body = remaining[:next_func.start()]
+        if i + 1 < len(matches):
+            end_pos = matches[i + 1].start()
         else:
-            func_body = remaining[:min(2000, len(remaining))]
+            end_pos = min(start_pos + 2000, len(content))
 
-        line_count = len(func_body.split("\n"))
-        complexity = calculate_cyclomatic_complexity(func_body)
+        line_count = content.count(b"\n", start_pos, end_pos) + 1
+        complexity = calculate_cyclomatic_complexity(content, start_pos, end_pos)
 
         functions.append({
             "name": name,
@@ -163,57 +228,111 @@ def find_functions(content: str, language: str) -> List[Dict]:
     return functions
 
 
-def find_classes(content: str, language: str) -> List[Dict]:
+def find_classes(content: bytes, language: str) -> List[Dict]:
     """Find class definitions and their metrics."""
     classes = []
 
-    patterns = {
-        "python": r"class\s+(\w+)",
-        "typescript": r"class\s+(\w+)",
-        "javascript": r"class\s+(\w+)",
-        "go": r"type\s+(\w+)\s+struct",
-        "swift": r"class\s+(\w+)",
-        "kotlin": r"class\s+(\w+)"
-    }
-
-    pattern = patterns.get(language, patterns["python"])
-    matches = re.finditer(pattern, content)
+    pattern = CLASS_PATTERNS.get(language, CLASS_PATTERNS["python"])
+    method_pattern = METHOD_PATTERNS.get(language, METHOD_PATTERNS["python"])
+    matches = list(pattern.finditer(content))
 
-    for match in matches:
-        name = match.group(1)
+    for i, match in enumerate(matches):
+        name = decode(match.group(1))
 
+        # The class body runs until the next class; scan it in place
         start_pos = match.end()
-        remaining = content[start_pos:]
-
-        next_class = re.search(pattern, remaining)
-        if next_class:
-            class_body = remaining[:next_class.start()]
-        else:
-            class_body = remaining
+        end_pos = matches[i + 1].start() if i + 1 < len(matches) else len(content)
 
         # Count methods
-        method_patterns = {
-            "python": r"def\s+\w+\s*\(",
-            "typescript": r"(?:public|private|protected)?\s*\w+\s*\([^)]*\)\s*[:{]",
-            "javascript": r"\w+\s*\([^)]*\)\s*\{",
-            "go": r"func\s+\(",
-            "swift": r"func\s+\w+",
-            "kotlin": r"fun\s+\w+"
-        }
-        method_pattern = method_patterns.get(language, method_patterns["python"])
-        methods = len(re.findall(method_pattern, class_body))
+        methods = len(method_pattern.findall(content, start_pos, end_pos))
 
         classes.append({
             "name": name,
             "methods": methods,
-            "lines": len(class_body.split("\n"))
+            "lines": content.count(b"\n", start_pos, end_pos) + 1
         })
 
     return classes
 
 
-def check_code_smells(content: str, functions: List[Dict], classes: List[Dict]) -> List[Dict]:
-    """Check for code smells in the content."""
+# AST node types that add a decision point to a Python function; ast.parse
+# only yields these exact classes, so the walk can test membership by type
+PYTHON_BRANCH_NODES = frozenset((
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler
+) + ((ast.match_case,) if hasattr(ast, "match_case") else ()))
+
+PYTHON_SCOPE_NODES = frozenset((ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda))
+
+
+def calculate_python_complexity(node: ast.AST) -> int:
+    """
+    McCabe complexity of a Python function body, excluding nested definitions.
+    """
+    complexity = 1
+    stack = list(node.body)
+    pop, extend, iter_child_nodes = stack.pop, stack.extend, ast.iter_child_nodes
+    while stack:
+        child = pop()
+        kind = type(child)
+        if kind in PYTHON_SCOPE_NODES:
+            continue
+        if kind in PYTHON_BRANCH_NODES:
+            complexity += 1
+        elif kind is ast.BoolOp:
+            complexity += len(child.values) - 1
+        elif kind is ast.comprehension:
+            complexity += 1 + len(child.ifs)
+        extend(iter_child_nodes(child))
+    return complexity
+
+
+def analyze_python_ast(content: bytes) -> Optional[Tuple[List[Dict], List[Dict]]]:
+    """
+    Find Python functions and classes from a single AST parse.
+
+    Returns None when the source does not parse, so callers can fall back
+    to the regex heuristics.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    functions = []
+    classes = []
+    nodes = sorted(
+        (node for node in ast.walk(tree)
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))),
+        key=lambda node: (node.lineno, node.col_offset)
+    )
+
+    for node in nodes:
+        lines = node.end_lineno - node.lineno + 1
+        if isinstance(node, ast.ClassDef):
+            classes.append({
+                "name": node.name,
+                "methods": sum(
+                    isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) for item in node.body
+                ),
+                "lines": lines
+            })
+        else:
+            args = node.args
+            functions.append({
+                "name": node.name,
+                "parameters": (
+                    len(args.posonlyargs) + len(args.args) + len(args.kwonlyargs)
+                    + (args.vararg is not None) + (args.kwarg is not None)
+                ),
+                "lines": lines,
+                "complexity": calculate_python_complexity(node)
+            })
+
+    return functions, classes
+
+
+def check_code_smells(lines: List[bytes], functions: List[Dict], classes: List[Dict]) -> List[Dict]:
+    """Check for code smells in the content, given as its list of lines."""
     smells = []
 
     # Long functions
@@ -257,40 +376,45 @@ def check_code_smells(content: str, functions: List[Dict], classes: List[Dict])
                 "location": cls["name"]
             })
 
-    # Magic numbers
-    magic_pattern = r"\b(?<![.\"\'])\d{3,}\b(?!\.\d)"
-    for i, line in enumerate(content.split("\n"), 1):
-        if line.strip().startswith(("#", "//", "import", "from")):
-            continue
-        matches = re.findall(magic_pattern, line)
-        for match in matches[:1]:  # One per line
-            smells.append({
-                "type": "magic_number",
-                "severity": "low",
-                "message": f"Magic number {match} should be a named constant",
-                "location": f"line {i}"
-            })
-
-    # Commented code patterns
-    commented_code_pattern = r"^\s*[#//]+\s*(if|for|while|def|function|class|const|let|var)\s"
-    for i, line in enumerate(content.split("\n"), 1):
-        if re.match(commented_code_pattern, line, re.IGNORECASE):
-            smells.append({
+    # Magic numbers and commented code, in one pass over the lines
+    magic_numbers = []
+    commented_code = []
+    for i, line in enumerate(lines, 1):
+        stripped = line.lstrip()
+        if not stripped.startswith((b"#", b"//", b"import", b"from")):
+            match = MAGIC_NUMBER_PATTERN.search(line)  # One per line
+            if match:
+                magic_numbers.append({
+                    "type": "magic_number",
+                    "severity": "low",
+                    "message": f"Magic number {decode(match.group())} should be a named constant",
+                    "location": f"line {i}"
+                })
+
+        if stripped.startswith((b"#", b"/")) and COMMENTED_CODE_PATTERN.match(stripped):
+            commented_code.append({
                 "type": "commented_code",
                 "severity": "low",
                 "message": "Commented-out code should be removed",
                 "location": f"line {i}"
             })
 
+    smells.extend(magic_numbers)
+    smells.extend(commented_code)
+
     return smells
 
 
-def check_solid_violations(content: str) -> List[Dict]:
+def check_solid_violations(content: bytes) -> List[Dict]:
     """Check for potential SOLID principle violations."""
     violations = []
 
+    # Cheap substring checks rule out most files before any regex scan runs
+
     # OCP: Type checking instead of polymorphism
-    type_checks = len(re.findall(r"isinstance\(|type\(.*\)\s*==|typeof\s+\w+\s*===", content))
+    type_checks = 0
+    if b"isinstance(" in content or b"type(" in content or b"typeof" in content:
+        type_checks = len(TYPE_CHECK_PATTERN.findall(content))
     if type_checks > 2:
         violations.append({
             "principle": "OCP",
@@ -300,7 +424,7 @@ def check_solid_violations(content: str) -> List[Dict]:
         })
 
     # LSP/ISP: NotImplementedError
-    not_impl = len(re.findall(r"raise\s+NotImplementedError|not\s+implemented", content, re.IGNORECASE))
+    not_impl = len(NOT_IMPLEMENTED_PATTERN.findall(content))
     if not_impl:
         violations.append({
             "principle": "LSP/ISP",
@@ -310,7 +434,7 @@ def check_solid_violations(content: str) -> List[Dict]:
         })
 
     # DIP: Too many direct imports
-    imports = len(re.findall(r"^(?:import|from)\s+", content, re.MULTILINE))
+    imports = len(IMPORT_PATTERN.findall(content))
     if imports > THRESHOLDS["max_imports"]:
         violations.append({
             "principle": "DIP",
@@ -333,22 +457,10 @@ def calculate_quality_score(
     score = 100
 
     # Deduct for code smells
-    for smell in smells:
-        if smell["severity"] == "high":
-            score -= 10
-        elif smell["severity"] == "medium":
-            score -= 5
-        elif smell["severity"] == "low":
-            score -= 2
+    score -= sum(SMELL_PENALTIES.get(smell["severity"], 0) for smell in smells)
 
     # Deduct for SOLID violations
-    for violation in violations:
-        if violation["severity"] == "high":
-            score -= 8
-        elif violation["severity"] == "medium":
-            score -= 4
-        elif violation["severity"] == "low":
-            score -= 2
+    score -= sum(VIOLATION_PENALTIES.get(violation["severity"], 0) for violation in violations)
 
     # Bonus for good comment ratio (10-30%)
     if line_metrics["total"] > 0:
@@ -379,7 +491,30 @@ def get_grade(score: int) -> str:
         return "F"
 
 
-def analyze_file(filepath: Path) -> Dict:
+def get_cache_path(filepath: Path) -> Optional[Path]:
+    """Return the cache entry for the file's current contents, or None if it cannot be stat'ed."""
+    try:
+        st = filepath.stat()
+    except OSError:
+        return None
+    return cache_entry(CACHE_NAME, f"{CHECKER_STAMP}:{filepath}:{st.st_mtime_ns}:{st.st_size}")
+
+
+def analyze_file(filepath: Path, use_cache: bool = True) -> Dict:
+    """Analyze a single file for code quality, reusing cached results for unchanged files."""
+    cache_path = get_cache_path(filepath) if use_cache else None
+    if cache_path is not None:
+        cached = read_cache(cache_path)
+        if cached is not None:
+            return cached
+
+    result = analyze_file_uncached(filepath)
+    if cache_path is not None and "error" not in result:
+        write_cache(cache_path, result)
+    return result
+
+
+def analyze_file_uncached(filepath: Path) -> Dict:
     """Analyze a single file for code quality."""
     language = detect_language(filepath)
     if not language:
@@ -390,9 +525,13 @@ def analyze_file(filepath: Path) -> Dict:
         return {"error": f"Could not read file: {filepath}"}
 
     line_metrics = count_lines(content)
-    functions = find_functions(content, language)
-    classes = find_classes(content, language)
-    smells = check_code_smells(content, functions, classes)
+    parsed = analyze_python_ast(content) if language == "python" else None
+    if parsed is not None:
+        functions, classes = parsed
+    else:
+        functions = find_functions(content, language)
+        classes = find_classes(content, language)
+    smells = check_code_smells(content.split(b"\n"), functions, classes)
     violations = check_solid_violations(content)
     score = calculate_quality_score(line_metrics, functions, classes, smells, violations)
 
@@ -414,13 +553,44 @@ def analyze_file(filepath: Path) -> Dict:
     }
 
 
+def iter_source_files(dir_path: Path, extensions: List[str], recursive: bool = True):
+    """Yield files with a matching extension, pruning excluded directories during the walk."""
+    ext_set = set(extensions)
+    for root, dirs, files in os.walk(dir_path):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS] if recursive else []
+        for name in files:
+            if os.path.splitext(name)[1].lower() in ext_set:
+                yield Path(root) / name
+
+
+def summarize_file(filepath: Path, use_cache: bool = True) -> Dict:
+    """Analyze a file, keeping only the fields a directory summary reports."""
+    result = analyze_file(filepath, use_cache)
+    if "error" in result:
+        return result
+    return {
+        "file": result["file"],
+        "quality_score": result["quality_score"],
+        "grade": result["grade"],
+        "smell_count": len(result["smells"]),
+        "violation_count": len(result["solid_violations"])
+    }
+
+
 def analyze_directory(
     dir_path: Path,
     recursive: bool = True,
-    language: Optional[str] = None
+    language: Optional[str] = None,
+    use_cache: bool = True,
+    details: bool = True
 ) -> Dict:
-    """Analyze all files in a directory."""
-    results = []
+    """
+    Analyze all files in a directory.
+
+    With details=False each file contributes only a small summary record,
+    so memory stays flat on very large trees; full per-file results remain
+    available from the on-disk cache.
+    """
     extensions = []
 
     if language:
@@ -429,23 +599,27 @@ def analyze_directory(
         for exts in LANGUAGE_EXTENSIONS.values():
             extensions.extend(exts)
 
-    pattern = "**/*" if recursive else "*"
+    files = list(iter_source_files(dir_path, extensions, recursive))
 
-    for ext in extensions:
-        for filepath in dir_path.glob(f"{pattern}{ext}"):
-            if "node_modules" in str(filepath) or ".git" in str(filepath):
-                continue
-            result = analyze_file(filepath)
-            if "error" not in result:
-                results.append(result)
+    analyze = partial(analyze_file if details else summarize_file, use_cache=use_cache)
+    if len(files) < PARALLEL_ANALYSIS_THRESHOLD:
+        results = [r for r in map(analyze, files) if "error" not in r]
+    else:
+        with ProcessPoolExecutor() as executor:
+            results = [r for r in executor.map(analyze, files, chunksize=8) if "error" not in r]
 
     if not results:
         return {"error": "No supported files found"}
 
     total_score = sum(r["quality_score"] for r in results)
     avg_score = total_score / len(results)
-    total_smells = sum(len(r["smells"]) for r in results)
-    total_violations = sum(len(r["solid_violations"]) for r in results)
+    if details:
+        total_smells = sum(len(r["smells"]) for r in results)
+        total_violations = sum(len(r["solid_violations"]) for r in results)
+    else:
+        total_smells = sum(r["smell_count"] for r in results)
+        total_violations = sum(r["violation_count"] for r in results)
+    results.sort(key=itemgetter("quality_score"))
 
     return {
         "directory": str(dir_path),
@@ -454,7 +628,7 @@ def analyze_directory(
         "overall_grade": get_grade(int(avg_score)),
         "total_code_smells": total_smells,
         "total_solid_violations": total_violations,
-        "files": sorted(results, key=lambda x: x["quality_score"])
+        "files": results
     }
 
 
@@ -530,6 +704,11 @@ def main():
         "--output", "-o",
         help="Write output to file"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write cached per-file results in {get_cache_dir(CACHE_NAME) or 'the user cache directory'}"
+    )
 
     args = parser.parse_args()
 
@@ -540,18 +719,23 @@ def main():
         sys.exit(1)
 
     if target.is_file():
-        analysis = analyze_file(target)
+        analysis = analyze_file(target, not args.no_cache)
     else:
-        analysis = analyze_directory(target, args.recursive, args.language)
+        # The text report lists only scores, so full per-file details are kept for --json
+        analysis = analyze_directory(
+            target, args.recursive, args.language, not args.no_cache, details=args.json
+        )
 
     if args.json:
-        output = json.dumps(analysis, indent=2, default=str)
+        output = json_dumps(analysis, indent=True)
         if args.output:
-            with open(args.output, "w") as f:
+            with open(args.output, "wb") as f:
                 f.write(output)
             print(f"Results written to {args.output}")
         else:
-            print(output)
+            sys.stdout.flush()
+            sys.stdout.buffer.write(output + b"\n")
+            sys.stdout.buffer.flush()
     else:
         print_report(analysis)
 
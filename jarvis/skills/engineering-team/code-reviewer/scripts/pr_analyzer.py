@@ -12,13 +12,18 @@ Usage:
 """
 
 import argparse
-import json
 import os
 import re
 import subprocess
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from analysis_cache import cache_entry, get_cache_dir, json_dumps, read_cache, write_cache
 
 
 # File categories for review prioritization
@@ -56,52 +61,94 @@ FILE_CATEGORIES = {
     }
 }
 
-# Risky patterns to flag
+# One case-insensitive alternation per category, in priority order, so each
+# category costs a single search of the path as given
+CATEGORY_PATTERNS = [
+    (
+        category,
+        info["weight"],
+        re.compile("|".join(f"(?:{p})" for p in info["patterns"]), re.IGNORECASE)
+    )
+    for category, info in FILE_CATEGORIES.items()
+]
+
+# Risky patterns to flag, compiled once (case-insensitive) and matched
+# against the raw bytes git produces
 RISK_PATTERNS = [
     {
         "name": "hardcoded_secrets",
-        "pattern": r"(password|secret|api_key|token)\s*[=:]\s*['\"][^'\"]+['\"]",
+        "pattern": re.compile(rb"(password|secret|api_key|token)\s*[=:]\s*['\"][^'\"]+['\"]", re.IGNORECASE),
         "severity": "critical",
         "message": "Potential hardcoded secret detected"
     },
     {
         "name": "todo_fixme",
-        "pattern": r"(TODO|FIXME|HACK|XXX):",
+        "pattern": re.compile(rb"(TODO|FIXME|HACK|XXX):", re.IGNORECASE),
         "severity": "low",
         "message": "TODO/FIXME comment found"
     },
     {
         "name": "console_log",
-        "pattern": r"console\.(log|debug|info|warn|error)\(",
+        "pattern": re.compile(rb"console\.(log|debug|info|warn|error)\(", re.IGNORECASE),
         "severity": "medium",
         "message": "Console statement found (remove for production)"
     },
     {
         "name": "debugger",
-        "pattern": r"\bdebugger\b",
+        "pattern": re.compile(rb"\bdebugger\b", re.IGNORECASE),
         "severity": "high",
         "message": "Debugger statement found"
     },
     {
         "name": "disable_eslint",
-        "pattern": r"eslint-disable",
+        "pattern": re.compile(rb"eslint-disable", re.IGNORECASE),
         "severity": "medium",
         "message": "ESLint rule disabled"
     },
     {
         "name": "any_type",
-        "pattern": r":\s*any\b",
+        "pattern": re.compile(rb":\s*any\b", re.IGNORECASE),
         "severity": "medium",
         "message": "TypeScript 'any' type used"
     },
     {
         "name": "sql_concatenation",
-        "pattern": r"(SELECT|INSERT|UPDATE|DELETE).*\+.*['\"]",
+        "pattern": re.compile(rb"(SELECT|INSERT|UPDATE|DELETE).*\+.*['\"]", re.IGNORECASE),
         "severity": "critical",
         "message": "Potential SQL injection (string concatenation in query)"
     }
 ]
 
+# Conventional commit subject prefix, e.g. "feat(auth):"
+CONVENTIONAL_COMMIT_PATTERN = re.compile(
+    r"(?:feat|fix|docs|style|refactor|test|chore|perf|ci|build|revert)(?:\(.+\))?:"
+)
+
+# Generated files that are never risk-scanned, whatever their category
+SKIP_RISK_PATTERN = re.compile(r"\.(?:lock|snap|min\.js|map|svg)$", re.IGNORECASE)
+
+# Finished analyses, keyed by the commits they cover
+CACHE_NAME = "pr_analyzer"
+
+# Changes to this script invalidate every cached analysis
+ANALYZER_STAMP = os.stat(__file__).st_mtime_ns
+
+# Seconds a git command may run before it is killed
+GIT_TIMEOUT = 30
+
+# Below this many files, process pool start-up costs more than the risk
+# scan it spreads out (re holds the GIL, so threads would not help)
+PARALLEL_SCAN_THRESHOLD = 64
+
+# An added diff line (not the "+++" file header), anchored on the newline
+# before it so the regex engine can jump between literal "\n+" hits
+ADDED_LINE_PATTERN = re.compile(rb"\n\+(?!\+\+)([^\n]*)")
+
+# Per-file diff header line; the path is captured when both sides name the
+# same unquoted path, as they do in a rename-free diff
+DIFF_HEADER_PREFIX = b"diff --git "
+DIFF_HEADER_PATTERN = re.compile(rb"diff --git (?:a/(.+) b/\1|.*)$")
+
 
 def run_git_command(cmd: List[str], cwd: Path) -> Tuple[bool, str]:
     """Run a git command and return success status and output."""
@@ -111,7 +158,7 @@ def run_git_command(cmd: List[str], cwd: Path) -> Tuple[bool, str]:
             cwd=cwd,
             capture_output=True,
             text=True,
-            timeout=30
+            timeout=GIT_TIMEOUT
         )
         return result.returncode == 0, result.stdout.strip()
     except subprocess.TimeoutExpired:
@@ -120,24 +167,32 @@ def run_git_command(cmd: List[str], cwd: Path) -> Tuple[bool, str]:
         return False, str(e)
 
 
-def get_changed_files(repo_path: Path, base: str, head: str) -> List[Dict]:
-    """Get list of changed files between two refs."""
+def get_changed_files(repo_path: Path, base: str, head: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Get list of changed files between two refs.
+
+    Also returns the `git diff` range arguments the list came from, so the
+    file diffs can be read from the same range.
+    """
+    diff_range = [f"{base}...{head}"]
     success, output = run_git_command(
-        ["git", "diff", "--name-status", f"{base}...{head}"],
+        ["git", "diff", "--name-status"] + diff_range,
         repo_path
     )
 
     if not success:
         # Try without the triple dot (for uncommitted changes)
+        diff_range = [base, head]
         success, output = run_git_command(
-            ["git", "diff", "--name-status", base, head],
+            ["git", "diff", "--name-status"] + diff_range,
             repo_path
         )
 
     if not success or not output:
         # Fall back to staged changes
+        diff_range = ["--cached"]
         success, output = run_git_command(
-            ["git", "diff", "--name-status", "--cached"],
+            ["git", "diff", "--name-status"] + diff_range,
             repo_path
         )
 
@@ -161,49 +216,143 @@ def get_changed_files(repo_path: Path, base: str, head: str) -> List[Dict]:
                 "status": status_map.get(status, "modified")
             })
 
+    return files, diff_range
+
+
+def run_git_stream(cmd: List[str], cwd: Path) -> Iterator[bytes]:
+    """
+    Run a git command and yield its raw output line by line as it is read.
+
+    Raises subprocess.TimeoutExpired if the command runs longer than
+    GIT_TIMEOUT seconds (it is killed), or subprocess.CalledProcessError if
+    it fails.
+    """
+    expired = threading.Event()
+
+    def kill() -> None:
+        expired.set()
+        proc.kill()
+
+    with subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        # A hung git (waiting on a lock or a prompt) may never write another
+        # line, so the deadline is enforced by a timer rather than between reads
+        timer = threading.Timer(GIT_TIMEOUT, kill)
+        timer.start()
+        try:
+            yield from proc.stdout
+        finally:
+            timer.cancel()
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(cmd, GIT_TIMEOUT)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def get_added_content(diff_content: bytes) -> bytes:
+    """
+    Return the added lines of one file's diff, without their "+" marker.
+
+    The diff must start with its "diff --git" header line.
+    """
+    return b"\n".join(ADDED_LINE_PATTERN.findall(diff_content))
+
+
+def parse_diff_stream(lines: Iterable[bytes]) -> Dict[str, Tuple[int, int, bytes]]:
+    """
+    Split streamed `git diff --numstat --patch` output into per-file entries.
+
+    Only one file's diff is held at a time, and none for files that are
+    not risk-scanned. Returns a mapping of path to (additions, deletions,
+    added content), with the counts taken from git's numstat lines.
+    """
+    counts = {}
+    files = {}
+    in_patch = False
+    path = None
+    chunk = []
+
+    # A trailing sentinel header flushes the last file's diff
+    for line in chain(lines, [DIFF_HEADER_PREFIX]):
+        if line.startswith(DIFF_HEADER_PREFIX):
+            if path is not None:
+                files[path] = counts.get(path, (0, 0)) + (get_added_content(b"".join(chunk)),)
+            in_patch = True
+            path = DIFF_HEADER_PATTERN.match(line.rstrip(b"\n")).group(1)
+            if path is not None:
+                path = path.decode("utf-8", "replace")
+            chunk = [line] if path is not None and should_scan_risks(path) else []
+        elif chunk:
+            chunk.append(line)
+        elif not in_patch:
+            parts = line.rstrip(b"\n").split(b"\t", 2)
+            if len(parts) == 3:
+                additions, deletions, path = parts
+                # Binary files report "-" for both counts
+                counts[path.decode("utf-8", "replace")] = (
+                    int(additions) if additions != b"-" else 0,
+                    int(deletions) if deletions != b"-" else 0
+                )
+
     return files
 
 
-def get_file_diff(repo_path: Path, filepath: str, base: str, head: str) -> str:
-    """Get diff content for a specific file."""
-    success, output = run_git_command(
-        ["git", "diff", f"{base}...{head}", "--", filepath],
-        repo_path
-    )
-    if not success:
-        success, output = run_git_command(
-            ["git", "diff", "--cached", "--", filepath],
-            repo_path
-        )
-    return output if success else ""
+def read_diff_changes(repo_path: Path, diff_args: List[str]) -> Dict[str, Tuple[int, int, bytes]]:
+    """Stream and parse `git diff` output for the given range and options."""
+    cmd = ["git", "diff", "--no-color", "--numstat", "--patch"] + diff_args
+    try:
+        return parse_diff_stream(run_git_stream(cmd, repo_path))
+    except (OSError, subprocess.SubprocessError):
+        return {}
+
+
+def get_file_changes(repo_path: Path, filepath: str, diff_range: List[str]) -> Tuple[int, int, bytes]:
+    """Get addition and deletion counts and added content for a specific file."""
+    changes = read_diff_changes(repo_path, diff_range + ["--", filepath])
+    return next(iter(changes.values()), (0, 0, b""))
+
+
+def get_all_changes(repo_path: Path, diff_range: List[str]) -> Dict[str, Tuple[int, int, bytes]]:
+    """
+    Get change counts and added content for every changed file in a diff
+    range (as returned by get_changed_files) from a single streamed git call.
 
+    Renames are reported as a deletion plus an addition, matching what a
+    per-file diff shows. Returns a mapping of path to
+    (additions, deletions, added content).
+    """
+    return read_diff_changes(repo_path, diff_range + ["--no-renames"])
 
+
+@lru_cache(maxsize=8192)
 def categorize_file(filepath: str) -> Tuple[str, int]:
-    """Categorize a file based on its path and name."""
-    filepath_lower = filepath.lower()
+    """
+    Categorize a file based on its path and name.
 
-    for category, info in FILE_CATEGORIES.items():
-        for pattern in info["patterns"]:
-            if re.search(pattern, filepath_lower):
-                return category, info["weight"]
+    Results are memoized, since the same paths recur across PRs analyzed
+    in one process.
+    """
+    for category, weight, pattern in CATEGORY_PATTERNS:
+        if pattern.search(filepath):
+            return category, weight
 
     return "medium", 2  # Default category
 
 
-def analyze_diff_for_risks(diff_content: str, filepath: str) -> List[Dict]:
-    """Analyze diff content for risky patterns."""
-    risks = []
+def should_scan_risks(filepath: str) -> bool:
+    """
+    Whether a file's added lines are scanned for risks. Low-priority files
+    (tests, docs) and generated files still count toward complexity but
+    are not risk-scanned.
+    """
+    return categorize_file(filepath)[0] != "low" and not SKIP_RISK_PATTERN.search(filepath)
 
-    # Only analyze added lines (starting with +)
-    added_lines = [
-        line[1:] for line in diff_content.split("\n")
-        if line.startswith("+") and not line.startswith("+++")
-    ]
 
-    content = "\n".join(added_lines)
+def analyze_diff_for_risks(content: bytes, filepath: str) -> List[Dict]:
+    """Analyze added diff content, as returned by get_added_content, for risky patterns."""
+    risks = []
 
     for risk in RISK_PATTERNS:
-        matches = re.findall(risk["pattern"], content, re.IGNORECASE)
+        matches = risk["pattern"].findall(content)
         if matches:
             risks.append({
                 "name": risk["name"],
@@ -216,26 +365,15 @@ def analyze_diff_for_risks(diff_content: str, filepath: str) -> List[Dict]:
     return risks
 
 
-def count_changes(diff_content: str) -> Dict[str, int]:
-    """Count additions and deletions in diff."""
-    additions = 0
-    deletions = 0
-
-    for line in diff_content.split("\n"):
-        if line.startswith("+") and not line.startswith("+++"):
-            additions += 1
-        elif line.startswith("-") and not line.startswith("---"):
-            deletions += 1
-
-    return {"additions": additions, "deletions": deletions}
-
-
-def calculate_complexity_score(files: List[Dict], all_risks: List[Dict]) -> int:
+def calculate_complexity_score(
+    file_count: int,
+    total_changes: int,
+    risks_by_severity: Dict[str, List[Dict]]
+) -> int:
     """Calculate overall PR complexity score (1-10)."""
     score = 0
 
     # File count contribution (max 3 points)
-    file_count = len(files)
     if file_count > 20:
         score += 3
     elif file_count > 10:
@@ -244,7 +382,6 @@ def calculate_complexity_score(files: List[Dict], all_risks: List[Dict]) -> int:
         score += 1
 
     # Total changes contribution (max 3 points)
-    total_changes = sum(f.get("additions", 0) + f.get("deletions", 0) for f in files)
     if total_changes > 500:
         score += 3
     elif total_changes > 200:
@@ -253,11 +390,8 @@ def calculate_complexity_score(files: List[Dict], all_risks: List[Dict]) -> int:
         score += 1
 
     # Risk severity contribution (max 4 points)
-    critical_risks = sum(1 for r in all_risks if r["severity"] == "critical")
-    high_risks = sum(1 for r in all_risks if r["severity"] == "high")
-
-    score += min(2, critical_risks)
-    score += min(2, high_risks)
+    score += min(2, len(risks_by_severity["critical"]))
+    score += min(2, len(risks_by_severity["high"]))
 
     return min(10, max(1, score))
 
@@ -282,7 +416,7 @@ def analyze_commit_messages(repo_path: Path, base: str, head: str) -> Dict:
         # Check for conventional commit format
         message = commit[8:] if len(commit) > 8 else commit  # Skip hash
 
-        if not re.match(r"^(feat|fix|docs|style|refactor|test|chore|perf|ci|build|revert)(\(.+\))?:", message):
+        if not CONVENTIONAL_COMMIT_PATTERN.match(message):
             issues.append({
                 "commit": commit[:7],
                 "issue": "Does not follow conventional commit format"
@@ -300,14 +434,34 @@ def analyze_commit_messages(repo_path: Path, base: str, head: str) -> Dict:
     }
 
 
+def get_cache_path(repo_path: Path, base: str, head: str) -> Optional[Path]:
+    """Return the cache entry for the commits base and head resolve to, or None if they do not."""
+    success, output = run_git_command(["git", "rev-parse", base, head], repo_path)
+    if not success:
+        return None
+    return cache_entry(CACHE_NAME, f"{ANALYZER_STAMP}:{repo_path}:{output}")
+
+
 def analyze_pr(
     repo_path: Path,
     base: str = "main",
-    head: str = "HEAD"
+    head: str = "HEAD",
+    use_cache: bool = True
 ) -> Dict:
-    """Perform complete PR analysis."""
+    """
+    Perform complete PR analysis.
+
+    Analyses of a commit range are cached by the commits' SHAs, so repeat
+    runs over the same range only cost a `git rev-parse`.
+    """
+    cache_path = get_cache_path(repo_path, base, head) if use_cache else None
+    if cache_path is not None:
+        cached = read_cache(cache_path)
+        if cached is not None:
+            return cached
+
     # Get changed files
-    changed_files = get_changed_files(repo_path, base, head)
+    changed_files, diff_range = get_changed_files(repo_path, base, head)
 
     if not changed_files:
         return {
@@ -316,30 +470,48 @@ def analyze_pr(
         }
 
     # Analyze each file
-    all_risks = []
+    risks_by_severity = {"critical": [], "high": [], "medium": [], "low": []}
     file_analyses = []
+    total_additions = 0
+    total_deletions = 0
+    all_changes = get_all_changes(repo_path, diff_range)
+    added_contents = []
 
     for file_info in changed_files:
         filepath = file_info["path"]
         category, weight = categorize_file(filepath)
 
-        # Get diff for the file
-        diff = get_file_diff(repo_path, filepath, base, head)
-        changes = count_changes(diff)
-        risks = analyze_diff_for_risks(diff, filepath)
-
-        all_risks.extend(risks)
+        # Get changes for the file, asking git directly for paths the batch missed
+        if filepath in all_changes:
+            additions, deletions, added = all_changes[filepath]
+        else:
+            additions, deletions, added = get_file_changes(repo_path, filepath, diff_range)
+        added_contents.append(added)
+        total_additions += additions
+        total_deletions += deletions
 
         file_analyses.append({
             "path": filepath,
             "status": file_info["status"],
             "category": category,
             "priority_weight": weight,
-            "additions": changes["additions"],
-            "deletions": changes["deletions"],
-            "risks": risks
+            "additions": additions,
+            "deletions": deletions
         })
 
+    # Scan the added lines of every file for risks
+    paths = [f["path"] for f in file_analyses]
+    if len(added_contents) < PARALLEL_SCAN_THRESHOLD:
+        file_risks = map(analyze_diff_for_risks, added_contents, paths)
+    else:
+        with ProcessPoolExecutor() as executor:
+            file_risks = list(executor.map(analyze_diff_for_risks, added_contents, paths, chunksize=16))
+
+    for file_analysis, risks in zip(file_analyses, file_risks):
+        file_analysis["risks"] = risks
+        for risk in risks:
+            risks_by_severity[risk["severity"]].append(risk)
+
     # Sort by priority (highest first)
     file_analyses.sort(key=lambda x: (-x["priority_weight"], x["path"]))
 
@@ -347,12 +519,11 @@ def analyze_pr(
     commit_analysis = analyze_commit_messages(repo_path, base, head)
 
     # Calculate metrics
-    complexity = calculate_complexity_score(file_analyses, all_risks)
-
-    total_additions = sum(f["additions"] for f in file_analyses)
-    total_deletions = sum(f["deletions"] for f in file_analyses)
+    complexity = calculate_complexity_score(
+        len(file_analyses), total_additions + total_deletions, risks_by_severity
+    )
 
-    return {
+    result = {
         "status": "analyzed",
         "summary": {
             "files_changed": len(file_analyses),
@@ -362,17 +533,17 @@ def analyze_pr(
             "complexity_label": get_complexity_label(complexity),
             "commits": commit_analysis["commits"]
         },
-        "risks": {
-            "critical": [r for r in all_risks if r["severity"] == "critical"],
-            "high": [r for r in all_risks if r["severity"] == "high"],
-            "medium": [r for r in all_risks if r["severity"] == "medium"],
-            "low": [r for r in all_risks if r["severity"] == "low"]
-        },
+        "risks": risks_by_severity,
         "files": file_analyses,
         "commit_issues": commit_analysis["issues"],
         "review_order": [f["path"] for f in file_analyses[:10]]  # Top 10 priority files
     }
 
+    # Staged changes are not pinned down by the SHAs, so they are never cached
+    if cache_path is not None and diff_range != ["--cached"]:
+        write_cache(cache_path, result)
+    return result
+
 
 def get_complexity_label(score: int) -> str:
     """Get human-readable complexity label."""
@@ -432,8 +603,9 @@ def print_report(analysis: Dict) -> None:
 
     # Review order
     print("\n--- SUGGESTED REVIEW ORDER ---")
+    files_by_path = {f["path"]: f for f in analysis["files"]}
     for i, filepath in enumerate(analysis["review_order"], 1):
-        file_info = next(f for f in analysis["files"] if f["path"] == filepath)
+        file_info = files_by_path[filepath]
         print(f"  {i}. [{file_info['category'].upper()}] {filepath}")
 
     print("\n" + "=" * 60)
@@ -468,25 +640,33 @@ def main():
         "--output", "-o",
         help="Write output to file"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write cached analyses in {get_cache_dir(CACHE_NAME) or 'the user cache directory'}"
+    )
 
     args = parser.parse_args()
 
     repo_path = Path(args.repo_path).resolve()
 
-    if not (repo_path / ".git").exists():
+    # .git is a file rather than a directory in worktrees and submodules
+    if not os.path.exists(os.path.join(repo_path, ".git")):
         print(f"Error: {repo_path} is not a git repository", file=sys.stderr)
         sys.exit(1)
 
-    analysis = analyze_pr(repo_path, args.base, args.head)
+    analysis = analyze_pr(repo_path, args.base, args.head, not args.no_cache)
 
     if args.json:
-        output = json.dumps(analysis, indent=2)
+        output = json_dumps(analysis, indent=True)
         if args.output:
-            with open(args.output, "w") as f:
+            with open(args.output, "wb") as f:
                 f.write(output)
             print(f"Results written to {args.output}")
         else:
-            print(output)
+            sys.stdout.flush()
+            sys.stdout.buffer.write(output + b"\n")
+            sys.stdout.buffer.flush()
     else:
         print_report(analysis)
 
@@ -13,13 +13,24 @@ Usage:
 
 import argparse
 import json
+import mmap
 import os
-import subprocess
 import sys
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Directory holding the sibling analyzer scripts
+SCRIPT_DIR = Path(__file__).parent
 
 # Severity weights for prioritization
 SEVERITY_WEIGHTS = {
@@ -30,6 +41,53 @@ SEVERITY_WEIGHTS = {
     "info": 10
 }
 
+# Severities from most to least important
+SEVERITY_ORDER = sorted(SEVERITY_WEIGHTS, key=SEVERITY_WEIGHTS.get, reverse=True)
+
+# Group key shared by all severities without a weight; they rank equally, so
+# they stay in input order after the weighted groups
+UNRANKED_SEVERITY = None
+
+# Score deductions per PR risk and per code quality issue, by severity
+PR_RISK_DEDUCTIONS = {"critical": 15, "high": 10, "medium": 5, "low": 2}
+QUALITY_ISSUE_DEDUCTIONS = {"critical": 12, "high": 8, "medium": 4, "low": 1}
+
+# Severities that get an action item per finding instead of one per category
+UNGROUPED_SEVERITIES = frozenset({"critical", "high"})
+
+# Analysis files at least this large (bytes) are parsed from a memory map
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Analysis files larger than this (bytes) are not kept in the load cache
+JSON_CACHE_MAX_SIZE = 100 * 1024 * 1024
+
+# Buffer size for the --output file; large enough that a report is written
+# in a few system calls
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# Maximum number of action items in a report
+MAX_ACTION_ITEMS = 15
+
+# Actionable recommendation per issue category
+CATEGORY_ACTIONS = {
+    "hardcoded_secrets": "Remove hardcoded credentials and use environment variables or a secrets manager",
+    "sql_concatenation": "Use parameterized queries to prevent SQL injection",
+    "debugger": "Remove debugger statements before merging",
+    "console_log": "Remove or replace console statements with proper logging",
+    "todo_fixme": "Address TODO/FIXME comments or create tracking issues",
+    "disable_eslint": "Address the underlying issue instead of disabling lint rules",
+    "any_type": "Replace 'any' types with proper type definitions",
+    "long_function": "Break down function into smaller, focused units",
+    "god_class": "Split class into smaller, single-responsibility classes",
+    "too_many_params": "Use parameter objects or builder pattern",
+    "deep_nesting": "Refactor using early returns, guard clauses, or extraction",
+    "high_complexity": "Reduce cyclomatic complexity through refactoring",
+    "missing_error_handling": "Add proper error handling and recovery logic",
+    "duplicate_code": "Extract duplicate code into shared functions",
+    "magic_numbers": "Replace magic numbers with named constants",
+    "large_file": "Consider splitting into multiple smaller modules"
+}
+
 # Review verdict thresholds
 VERDICT_THRESHOLDS = {
     "approve": {"max_critical": 0, "max_high": 0, "max_score": 100},
@@ -39,53 +97,98 @@ VERDICT_THRESHOLDS = {
 }
 
 
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json_file(f: BinaryIO) -> Any:
+    """
+    Parse an open binary file. With orjson, large files are parsed straight
+    from a read-only memory map instead of being copied into a bytes object.
+    """
+    if orjson is not None and os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+    return json_loads(f.read())
+
+
+def read_json_path(filepath: str) -> Optional[Dict]:
+    """Parse a JSON file, or return None if it is missing or invalid."""
+    try:
+        with open(filepath, "rb") as f:
+            return read_json_file(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=32)
+def read_json_path_cached(filepath: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """Cached read_json_path; the stat fields only key the cache."""
+    return read_json_path(filepath)
+
+
 def load_json_file(filepath: str) -> Optional[Dict]:
-    """Load JSON file if it exists."""
+    """
+    Load JSON file if it exists. Results are cached per file and revalidated
+    against its mtime and size, so the returned dict may be shared between
+    calls and must not be modified.
+    """
     try:
-        with open(filepath, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        stat = os.stat(filepath)
+    except FileNotFoundError:
         return None
+    if stat.st_size > JSON_CACHE_MAX_SIZE:
+        return read_json_path(filepath)
+    return read_json_path_cached(filepath, stat.st_mtime_ns, stat.st_size)
 
 
-def run_pr_analyzer(repo_path: Path) -> Dict:
-    """Run pr_analyzer.py and return results."""
-    script_path = Path(__file__).parent / "pr_analyzer.py"
+def run_analyzer_script(script_name: str, repo_path: Path, timeout: int) -> Dict:
+    """Run one of the sibling analyzer scripts with --json and return its results."""
+    script_path = SCRIPT_DIR / script_name
     if not script_path.exists():
-        return {"status": "error", "message": "pr_analyzer.py not found"}
+        return {"status": "error", "message": f"{script_name} not found"}
+
+    # Only needed when an analysis was not supplied on the command line
+    import subprocess
+    import tempfile
 
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path), str(repo_path), "--json"],
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        return {"status": "error", "message": result.stderr}
+        # Spool the JSON to a temporary file rather than a pipe, so a huge
+        # result is never held in memory alongside its parsed form
+        with tempfile.TemporaryFile() as output:
+            result = subprocess.run(
+                [sys.executable, script_path, repo_path, "--json"],
+                stdout=output,
+                stderr=subprocess.PIPE,
+                timeout=timeout
+            )
+            if result.returncode == 0:
+                output.seek(0)
+                return read_json_file(output)
+        return {"status": "error", "message": result.stderr.decode("utf-8", "replace")}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+def run_pr_analyzer(repo_path: Path) -> Dict:
+    """Run pr_analyzer.py and return results."""
+    return run_analyzer_script("pr_analyzer.py", repo_path, timeout=120)
+
+
 def run_quality_checker(repo_path: Path) -> Dict:
     """Run code_quality_checker.py and return results."""
-    script_path = Path(__file__).parent / "code_quality_checker.py"
-    if not script_path.exists():
-        return {"status": "error", "message": "code_quality_checker.py not found"}
-
-    try:
-        result = subprocess.run(
-            [sys.executable, str(script_path), str(repo_path), "--json"],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        return {"status": "error", "message": result.stderr}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return run_analyzer_script("code_quality_checker.py", repo_path, timeout=300)
 
 
 def calculate_review_score(pr_analysis: Dict, quality_analysis: Dict) -> int:
@@ -95,18 +198,14 @@ def calculate_review_score(pr_analysis: Dict, quality_analysis: Dict) -> int:
     # Deduct for PR risks
     if "risks" in pr_analysis:
         risks = pr_analysis["risks"]
-        score -= len(risks.get("critical", [])) * 15
-        score -= len(risks.get("high", [])) * 10
-        score -= len(risks.get("medium", [])) * 5
-        score -= len(risks.get("low", [])) * 2
+        for severity, deduction in PR_RISK_DEDUCTIONS.items():
+            score -= len(risks.get(severity, [])) * deduction
 
     # Deduct for code quality issues
     if "issues" in quality_analysis:
-        issues = quality_analysis["issues"]
-        score -= len([i for i in issues if i.get("severity") == "critical"]) * 12
-        score -= len([i for i in issues if i.get("severity") == "high"]) * 8
-        score -= len([i for i in issues if i.get("severity") == "medium"]) * 4
-        score -= len([i for i in issues if i.get("severity") == "low"]) * 1
+        severity_counts = Counter(i.get("severity") for i in quality_analysis["issues"])
+        for severity, deduction in QUALITY_ISSUE_DEDUCTIONS.items():
+            score -= severity_counts[severity] * deduction
 
     # Deduct for complexity
     if "summary" in pr_analysis:
@@ -136,41 +235,51 @@ def determine_verdict(score: int, critical_count: int, high_count: int) -> Tuple
     return "block", "Significant issues prevent approval"
 
 
-def generate_findings_list(pr_analysis: Dict, quality_analysis: Dict) -> List[Dict]:
-    """Combine and prioritize all findings."""
-    findings = []
+def group_findings_by_severity(pr_analysis: Dict, quality_analysis: Dict) -> Dict[str, List[Dict]]:
+    """
+    Combine all findings, grouped by severity. Groups are ordered by severity
+    weight; findings of any unknown severity share one last group under
+    UNRANKED_SEVERITY. Findings keep their input order within a group.
+    """
+    by_severity = {severity: [] for severity in SEVERITY_ORDER}
+    unranked = by_severity[UNRANKED_SEVERITY] = []
 
     # Add PR risk findings
     if "risks" in pr_analysis:
         for severity, items in pr_analysis["risks"].items():
+            append = by_severity.get(severity, unranked).append
             for item in items:
-                findings.append({
+                get = item.get
+                append({
                     "source": "pr_analysis",
                     "severity": severity,
-                    "category": item.get("name", "unknown"),
-                    "message": item.get("message", ""),
-                    "file": item.get("file", ""),
-                    "count": item.get("count", 1)
+                    "category": get("name", "unknown"),
+                    "message": get("message", ""),
+                    "file": get("file", ""),
+                    "count": get("count", 1)
                 })
 
     # Add code quality findings
     if "issues" in quality_analysis:
         for issue in quality_analysis["issues"]:
-            findings.append({
+            get = issue.get
+            severity = get("severity", "medium")
+            by_severity.get(severity, unranked).append({
                 "source": "quality_analysis",
-                "severity": issue.get("severity", "medium"),
-                "category": issue.get("type", "unknown"),
-                "message": issue.get("message", ""),
-                "file": issue.get("file", ""),
-                "line": issue.get("line", 0)
+                "severity": severity,
+                "category": get("type", "unknown"),
+                "message": get("message", ""),
+                "file": get("file", ""),
+                "line": get("line", 0)
             })
 
-    # Sort by severity weight
-    findings.sort(
-        key=lambda x: -SEVERITY_WEIGHTS.get(x["severity"], 0)
-    )
+    return by_severity
 
-    return findings
+
+def generate_findings_list(pr_analysis: Dict, quality_analysis: Dict) -> List[Dict]:
+    """Combine and prioritize all findings."""
+    by_severity = group_findings_by_severity(pr_analysis, quality_analysis)
+    return list(chain.from_iterable(by_severity.values()))
 
 
 def generate_action_items(findings: List[Dict]) -> List[Dict]:
@@ -183,7 +292,7 @@ def generate_action_items(findings: List[Dict]) -> List[Dict]:
         severity = finding["severity"]
 
         # Group similar issues
-        if category in seen_categories and severity not in ["critical", "high"]:
+        if category in seen_categories and severity not in UNGROUPED_SEVERITIES:
             continue
 
         action = {
@@ -194,47 +303,45 @@ def generate_action_items(findings: List[Dict]) -> List[Dict]:
         }
         action_items.append(action)
         seen_categories.add(category)
+        if len(action_items) >= MAX_ACTION_ITEMS:
+            break
 
-    return action_items[:15]  # Top 15 actions
+    return action_items
 
 
 def get_action_for_category(category: str, finding: Dict) -> str:
     """Get actionable recommendation for issue category."""
-    actions = {
-        "hardcoded_secrets": "Remove hardcoded credentials and use environment variables or a secrets manager",
-        "sql_concatenation": "Use parameterized queries to prevent SQL injection",
-        "debugger": "Remove debugger statements before merging",
-        "console_log": "Remove or replace console statements with proper logging",
-        "todo_fixme": "Address TODO/FIXME comments or create tracking issues",
-        "disable_eslint": "Address the underlying issue instead of disabling lint rules",
-        "any_type": "Replace 'any' types with proper type definitions",
-        "long_function": "Break down function into smaller, focused units",
-        "god_class": "Split class into smaller, single-responsibility classes",
-        "too_many_params": "Use parameter objects or builder pattern",
-        "deep_nesting": "Refactor using early returns, guard clauses, or extraction",
-        "high_complexity": "Reduce cyclomatic complexity through refactoring",
-        "missing_error_handling": "Add proper error handling and recovery logic",
-        "duplicate_code": "Extract duplicate code into shared functions",
-        "magic_numbers": "Replace magic numbers with named constants",
-        "large_file": "Consider splitting into multiple smaller modules"
-    }
-    return actions.get(category, f"Review and address: {finding.get('message', category)}")
+    action = CATEGORY_ACTIONS.get(category)
+    if action is None:
+        action = f"Review and address: {finding.get('message', category)}"
+    return action
 
 
-def format_markdown_report(report: Dict) -> str:
-    """Generate markdown-formatted report."""
-    lines = []
+def findings_with_severity(report: Dict, severity: str) -> List[Dict]:
+    """Get the report's findings of one severity, using its index if present."""
+    by_severity = report.get("_by_severity")
+    if by_severity is not None and severity in SEVERITY_WEIGHTS:
+        return by_severity[severity]
+    return [f for f in report.get("findings", []) if f["severity"] == severity]
+
+
+def format_markdown_finding(finding: Dict) -> str:
+    """Format one finding as a markdown list entry (two lines)."""
+    return f"- **{finding['category']}** in `{finding.get('file', 'unknown')}`\n  - {finding['message']}"
+
 
+def iter_markdown_report(report: Dict) -> Iterator[str]:
+    """Generate the lines of a markdown-formatted report."""
     # Header
-    lines.append("# Code Review Report")
-    lines.append("")
-    lines.append(f"**Generated:** {report['metadata']['generated_at']}")
-    lines.append(f"**Repository:** {report['metadata']['repository']}")
-    lines.append("")
+    yield "# Code Review Report"
+    yield ""
+    yield f"**Generated:** {report['metadata']['generated_at']}"
+    yield f"**Repository:** {report['metadata']['repository']}"
+    yield ""
 
     # Executive Summary
-    lines.append("## Executive Summary")
-    lines.append("")
+    yield "## Executive Summary"
+    yield ""
     summary = report["summary"]
     verdict = summary["verdict"]
     verdict_emoji = {
@@ -244,120 +351,135 @@ def format_markdown_report(report: Dict) -> str:
         "block": "❌"
     }.get(verdict, "❓")
 
-    lines.append(f"**Verdict:** {verdict_emoji} {verdict.upper().replace('_', ' ')}")
-    lines.append(f"**Score:** {summary['score']}/100")
-    lines.append(f"**Rationale:** {summary['rationale']}")
-    lines.append("")
+    yield f"**Verdict:** {verdict_emoji} {verdict.upper().replace('_', ' ')}"
+    yield f"**Score:** {summary['score']}/100"
+    yield f"**Rationale:** {summary['rationale']}"
+    yield ""
 
     # Issue Counts
-    lines.append("### Issue Summary")
-    lines.append("")
-    lines.append("| Severity | Count |")
-    lines.append("|----------|-------|")
+    yield "### Issue Summary"
+    yield ""
+    yield "| Severity | Count |"
+    yield "|----------|-------|"
     for severity in ["critical", "high", "medium", "low"]:
         count = summary["issue_counts"].get(severity, 0)
-        lines.append(f"| {severity.capitalize()} | {count} |")
-    lines.append("")
+        yield f"| {severity.capitalize()} | {count} |"
+    yield ""
 
     # PR Statistics (if available)
     if "pr_summary" in report:
         pr = report["pr_summary"]
-        lines.append("### Change Statistics")
-        lines.append("")
-        lines.append(f"- **Files Changed:** {pr.get('files_changed', 'N/A')}")
-        lines.append(f"- **Lines Added:** +{pr.get('total_additions', 0)}")
-        lines.append(f"- **Lines Removed:** -{pr.get('total_deletions', 0)}")
-        lines.append(f"- **Complexity:** {pr.get('complexity_label', 'N/A')}")
-        lines.append("")
+        yield "### Change Statistics"
+        yield ""
+        yield f"- **Files Changed:** {pr.get('files_changed', 'N/A')}"
+        yield f"- **Lines Added:** +{pr.get('total_additions', 0)}"
+        yield f"- **Lines Removed:** -{pr.get('total_deletions', 0)}"
+        yield f"- **Complexity:** {pr.get('complexity_label', 'N/A')}"
+        yield ""
 
     # Action Items
     if report.get("action_items"):
-        lines.append("## Action Items")
-        lines.append("")
+        yield "## Action Items"
+        yield ""
         for i, item in enumerate(report["action_items"], 1):
             priority = item["priority"]
             emoji = "🔴" if priority == "P0" else "🟠" if priority == "P1" else "🟡"
-            lines.append(f"{i}. {emoji} **[{priority}]** {item['action']}")
+            yield f"{i}. {emoji} **[{priority}]** {item['action']}"
             if item.get("files_affected"):
-                lines.append(f"   - Files: {', '.join(item['files_affected'][:3])}")
-        lines.append("")
+                yield f"   - Files: {', '.join(item['files_affected'][:3])}"
+        yield ""
+
+    critical_findings = findings_with_severity(report, "critical")
+    high_findings = findings_with_severity(report, "high")
 
     # Critical Findings
-    critical_findings = [f for f in report.get("findings", []) if f["severity"] == "critical"]
     if critical_findings:
-        lines.append("## Critical Issues (Must Fix)")
-        lines.append("")
-        for finding in critical_findings:
-            lines.append(f"- **{finding['category']}** in `{finding.get('file', 'unknown')}`")
-            lines.append(f"  - {finding['message']}")
-        lines.append("")
+        yield "## Critical Issues (Must Fix)"
+        yield ""
+        yield from map(format_markdown_finding, critical_findings)
+        yield ""
 
     # High Priority Findings
-    high_findings = [f for f in report.get("findings", []) if f["severity"] == "high"]
     if high_findings:
-        lines.append("## High Priority Issues")
-        lines.append("")
-        for finding in high_findings[:10]:
-            lines.append(f"- **{finding['category']}** in `{finding.get('file', 'unknown')}`")
-            lines.append(f"  - {finding['message']}")
-        lines.append("")
+        yield "## High Priority Issues"
+        yield ""
+        yield from map(format_markdown_finding, high_findings[:10])
+        yield ""
 
     # Review Order (if available)
     if "review_order" in report:
-        lines.append("## Suggested Review Order")
-        lines.append("")
+        yield "## Suggested Review Order"
+        yield ""
         for i, filepath in enumerate(report["review_order"][:10], 1):
-            lines.append(f"{i}. `{filepath}`")
-        lines.append("")
+            yield f"{i}. `{filepath}`"
+        yield ""
 
     # Footer
-    lines.append("---")
-    lines.append("*Generated by Code Reviewer*")
+    yield "---"
+    yield "*Generated by Code Reviewer*"
 
-    return "\n".join(lines)
 
+def format_markdown_report(report: Dict) -> str:
+    """Generate markdown-formatted report."""
+    return "\n".join(iter_markdown_report(report))
 
-def format_text_report(report: Dict) -> str:
-    """Generate plain text report."""
-    lines = []
 
-    lines.append("=" * 60)
-    lines.append("CODE REVIEW REPORT")
-    lines.append("=" * 60)
-    lines.append("")
-    lines.append(f"Generated: {report['metadata']['generated_at']}")
-    lines.append(f"Repository: {report['metadata']['repository']}")
-    lines.append("")
+def iter_text_report(report: Dict) -> Iterator[str]:
+    """Generate the lines of a plain text report."""
+    yield "=" * 60
+    yield "CODE REVIEW REPORT"
+    yield "=" * 60
+    yield ""
+    yield f"Generated: {report['metadata']['generated_at']}"
+    yield f"Repository: {report['metadata']['repository']}"
+    yield ""
 
     summary = report["summary"]
     verdict = summary["verdict"].upper().replace("_", " ")
-    lines.append(f"VERDICT: {verdict}")
-    lines.append(f"SCORE: {summary['score']}/100")
-    lines.append(f"RATIONALE: {summary['rationale']}")
-    lines.append("")
+    yield f"VERDICT: {verdict}"
+    yield f"SCORE: {summary['score']}/100"
+    yield f"RATIONALE: {summary['rationale']}"
+    yield ""
 
-    lines.append("--- ISSUE SUMMARY ---")
+    yield "--- ISSUE SUMMARY ---"
     for severity in ["critical", "high", "medium", "low"]:
         count = summary["issue_counts"].get(severity, 0)
-        lines.append(f"  {severity.capitalize()}: {count}")
-    lines.append("")
+        yield f"  {severity.capitalize()}: {count}"
+    yield ""
 
     if report.get("action_items"):
-        lines.append("--- ACTION ITEMS ---")
+        yield "--- ACTION ITEMS ---"
         for i, item in enumerate(report["action_items"][:10], 1):
-            lines.append(f"  {i}. [{item['priority']}] {item['action']}")
-        lines.append("")
+            yield f"  {i}. [{item['priority']}] {item['action']}"
+        yield ""
 
-    critical = [f for f in report.get("findings", []) if f["severity"] == "critical"]
+    critical = findings_with_severity(report, "critical")
     if critical:
-        lines.append("--- CRITICAL ISSUES ---")
-        for f in critical:
-            lines.append(f"  [{f.get('file', 'unknown')}] {f['message']}")
-        lines.append("")
+        yield "--- CRITICAL ISSUES ---"
+        yield from (f"  [{f.get('file', 'unknown')}] {f['message']}" for f in critical)
+        yield ""
+
+    yield "=" * 60
+
+
+def format_text_report(report: Dict) -> str:
+    """Generate plain text report."""
+    return "\n".join(iter_text_report(report))
 
-    lines.append("=" * 60)
 
-    return "\n".join(lines)
+def write_report(report: Dict, output_format: str, stream: BinaryIO) -> None:
+    """
+    Write the report to a binary stream as UTF-8. Markdown and text reports
+    are written line by line as they are generated, never as one string.
+    """
+    if output_format == "json":
+        public = {key: value for key, value in report.items() if key != "_by_severity"}
+        stream.write(json_dumps(public, indent=True) + b"\n")
+        return
+
+    lines = iter_markdown_report(report) if output_format == "markdown" else iter_text_report(report)
+    for line in lines:
+        stream.write(f"{line}\n".encode())
 
 
 def generate_report(
@@ -366,22 +488,31 @@ def generate_report(
     quality_analysis: Optional[Dict] = None
 ) -> Dict:
     """Generate comprehensive review report."""
-    # Run analyses if not provided
+    # Run analyses if not provided; each runs in its own child process, so
+    # when both are needed they run side by side
+    if pr_analysis is None and quality_analysis is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pr_future = executor.submit(run_pr_analyzer, repo_path)
+            quality_future = executor.submit(run_quality_checker, repo_path)
+            pr_analysis = pr_future.result()
+            quality_analysis = quality_future.result()
+
     if pr_analysis is None:
         pr_analysis = run_pr_analyzer(repo_path)
 
     if quality_analysis is None:
         quality_analysis = run_quality_checker(repo_path)
 
-    # Generate findings
-    findings = generate_findings_list(pr_analysis, quality_analysis)
+    # Generate findings, grouped by severity once for every consumer
+    by_severity = group_findings_by_severity(pr_analysis, quality_analysis)
+    findings = list(chain.from_iterable(by_severity.values()))
 
     # Count issues by severity
     issue_counts = {
-        "critical": len([f for f in findings if f["severity"] == "critical"]),
-        "high": len([f for f in findings if f["severity"] == "high"]),
-        "medium": len([f for f in findings if f["severity"] == "medium"]),
-        "low": len([f for f in findings if f["severity"] == "low"])
+        severity: len(by_severity[severity])
+        for severity in ("critical", "high", "medium", "low")
     }
 
     # Calculate score and verdict
@@ -409,7 +540,9 @@ def generate_report(
             "issue_counts": issue_counts
         },
         "findings": findings,
-        "action_items": action_items
+        "action_items": action_items,
+        # Index for the formatters; not part of the JSON output
+        "_by_severity": by_severity
     }
 
     # Add PR summary if available
@@ -485,20 +618,15 @@ def main():
     # Format output
     output_format = "json" if args.json else args.format
 
-    if output_format == "json":
-        output = json.dumps(report, indent=2)
-    elif output_format == "markdown":
-        output = format_markdown_report(report)
-    else:
-        output = format_text_report(report)
-
     # Write or print output
     if args.output:
-        with open(args.output, "w") as f:
-            f.write(output)
+        with open(args.output, "wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+            write_report(report, output_format, f)
         print(f"Report written to {args.output}")
     else:
-        print(output)
+        sys.stdout.flush()
+        write_report(report, output_format, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+"""
+Tests for review_report_generator's severity grouping.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from review_report_generator import (  # noqa: E402
+    findings_with_severity,
+    generate_findings_list,
+)
+
+
+class FindingsOrderTest(unittest.TestCase):
+    """Findings are ordered by severity weight, stable within equal weights."""
+
+    def test_unknown_severities_keep_input_order(self):
+        pr_analysis = {
+            "risks": {
+                "weird": [{"name": "pr_weird"}],
+                "high": [{"name": "pr_high"}],
+                "blocker": [{"name": "pr_blocker"}],
+                "critical": [{"name": "pr_critical"}],
+            }
+        }
+        quality_analysis = {
+            "issues": [
+                {"type": "q_blocker", "severity": "blocker"},
+                {"type": "q_low", "severity": "low"},
+                {"type": "q_weird", "severity": "weird"},
+                {"type": "q_default"},
+            ]
+        }
+
+        findings = generate_findings_list(pr_analysis, quality_analysis)
+
+        # Same order as a stable sort on weight with unknown severities weighing 0:
+        # unknown ones are not grouped by name, they keep their input order
+        self.assertEqual([f["category"] for f in findings], [
+            "pr_critical", "pr_high", "q_default", "q_low",
+            "pr_weird", "pr_blocker", "q_blocker", "q_weird",
+        ])
+
+    def test_findings_with_unknown_severity(self):
+        findings = [{"severity": "weird"}, {"severity": "blocker"}, {"severity": "weird"}]
+        report = {"findings": findings, "_by_severity": {None: findings}}
+        self.assertEqual(findings_with_severity(report, "weird"), [findings[0], findings[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
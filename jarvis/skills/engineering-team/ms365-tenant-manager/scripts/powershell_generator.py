@@ -3,37 +3,13 @@ PowerShell script generator for Microsoft 365 administration tasks.
 Creates ready-to-use scripts with error handling and best practices.
 """
 
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 
-class PowerShellScriptGenerator:
-    """Generate PowerShell scripts for common Microsoft 365 admin tasks."""
-
-    def __init__(self, tenant_domain: str):
-        """
-        Initialize generator with tenant domain.
-
-        Args:
-            tenant_domain: Primary domain of the Microsoft 365 tenant
-        """
-        self.tenant_domain = tenant_domain
-
-    def generate_conditional_access_policy_script(self, policy_config: Dict[str, Any]) -> str:
-        """
-        Generate script to create Conditional Access policy.
-
-        Args:
-            policy_config: Policy configuration parameters
-
-        Returns:
-            PowerShell script
-        """
-        policy_name = policy_config.get('name', 'MFA Policy')
-        require_mfa = policy_config.get('require_mfa', True)
-        include_users = policy_config.get('include_users', 'All')
-        exclude_users = policy_config.get('exclude_users', [])
-
-        script = f"""<#
+# Conditional Access policy script (str.format template). The optional
+# exclude and MFA blocks are rendered from the templates below.
+CA_POLICY_SCRIPT = """<#
 .SYNOPSIS
     Create Conditional Access Policy: {policy_name}
 
@@ -52,40 +28,26 @@ $policyName = "{policy_name}"
 $conditions = @{{
     Users = @{{
         IncludeUsers = @("{include_users}")
-"""
-
-        if exclude_users:
-            exclude_list = '", "'.join(exclude_users)
-            script += f"""        ExcludeUsers = @("{exclude_list}")
-"""
-
-        script += """    }
-    Applications = @{
+{exclude_block}    }}
+    Applications = @{{
         IncludeApplications = @("All")
-    }
-    Locations = @{
+    }}
+    Locations = @{{
         IncludeLocations = @("All")
-    }
-}
-
-$grantControls = @{
-"""
-
-        if require_mfa:
-            script += """    BuiltInControls = @("mfa")
-    Operator = "OR"
-"""
+    }}
+}}
 
-        script += """}
+$grantControls = @{{
+{mfa_block}}}
 
-$policy = @{
+$policy = @{{
     DisplayName = $policyName
     State = "enabledForReportingButNotEnforced"  # Start in report-only mode
     Conditions = $conditions
     GrantControls = $grantControls
-}
+}}
 
-try {
+try {{
     $newPolicy = New-MgIdentityConditionalAccessPolicy -BodyParameter $policy
     Write-Host "✓ Conditional Access policy created: $($newPolicy.DisplayName)" -ForegroundColor Green
     Write-Host "  Policy ID: $($newPolicy.Id)" -ForegroundColor Cyan
@@ -95,22 +57,22 @@ try {
     Write-Host "1. Review policy in Azure AD > Security > Conditional Access"
     Write-Host "2. Monitor sign-in logs for impact assessment"
     Write-Host "3. When ready, change state to 'enabled' to enforce"
-} catch {
+}} catch {{
     Write-Host "✗ Error creating policy: $_" -ForegroundColor Red
-}
+}}
 
 Disconnect-MgGraph
 """
-        return script
 
-    def generate_security_audit_script(self) -> str:
-        """
-        Generate comprehensive security audit script.
+CA_EXCLUDE_USERS_BLOCK = """        ExcludeUsers = @("{exclude_list}")
+"""
 
-        Returns:
-            PowerShell script for security assessment
-        """
-        script = """<#
+CA_MFA_BLOCK = """    BuiltInControls = @("mfa")
+    Operator = "OR"
+"""
+
+# Security audit script; it takes no parameters, so it is built once
+SECURITY_AUDIT_SCRIPT = """<#
 .SYNOPSIS
     Microsoft 365 Security Audit Report
 
@@ -124,11 +86,73 @@ Disconnect-MgGraph
 
 # Connect to services
 Connect-MgGraph -Scopes "Directory.Read.All", "User.Read.All", "AuditLog.Read.All"
+# Version 3+ runs the Get-EXO* cmdlets over REST instead of remote PowerShell
+Import-Module ExchangeOnlineManagement -MinimumVersion 3.0.0 -ErrorAction Stop
 Connect-ExchangeOnline
 
 $timestamp = Get-Date -Format "yyyyMMdd_HHmmss"
 $reportPath = "SecurityAudit_$timestamp"
-New-Item -ItemType Directory -Path $reportPath -Force | Out-Null
+# .NET resolves relative paths against the process directory, not $PWD,
+# so the CSV writers below get the full path
+$reportDir = (New-Item -ItemType Directory -Path $reportPath -Force).FullName
+
+# Open a CSV file for streaming and write its header row
+function New-CsvWriter {
+    param([string]$Name, [string[]]$Columns)
+
+    $writer = [System.IO.StreamWriter]::new((Join-Path $reportDir $Name))
+    Write-CsvRow -Writer $writer -Fields $Columns
+    return $writer
+}
+
+# Write one CSV row, quoting every field the way Export-Csv does
+function Write-CsvRow {
+    param([System.IO.StreamWriter]$Writer, [object[]]$Fields)
+
+    $quoted = foreach ($field in $Fields) { '"' + ([string]$field).Replace('"', '""') + '"' }
+    $Writer.WriteLine($quoted -join ',')
+}
+
+# Send GET requests through the Graph $batch endpoint, 20 per round-trip.
+# The batch succeeds even when sub-requests fail, and the SDK does not retry
+# those, so throttled or unavailable ones (429/503/504) are resent here after
+# their Retry-After delay. Returns a hashtable of request id -> sub-response;
+# callers must check .status, as requests that keep failing return their
+# last error response.
+function Invoke-GraphBatch {
+    param([hashtable[]]$Requests, [int]$MaxRetries = 5)
+
+    $requestIndex = @{}
+    foreach ($request in $Requests) {
+        $requestIndex[$request.id] = $request
+    }
+
+    $responses = @{}
+    $pending = $Requests
+    for ($attempt = 0; $pending.Count -gt 0; $attempt++) {
+        $retry = [System.Collections.Generic.List[hashtable]]::new()
+        $retryAfter = 0
+        for ($i = 0; $i -lt $pending.Count; $i += 20) {
+            $chunk = @($pending[$i..([Math]::Min($i + 19, $pending.Count - 1))])
+            $body = @{ requests = $chunk } | ConvertTo-Json -Depth 5
+            $result = Invoke-MgGraphRequest -Method POST -Uri 'https://graph.microsoft.com/v1.0/$batch' -Body $body -ContentType 'application/json'
+            foreach ($response in $result.responses) {
+                $responses[$response.id] = $response
+                if (($response.status -in 429, 503, 504) -and $attempt -lt $MaxRetries) {
+                    $retry.Add($requestIndex[$response.id])
+                    $delay = [int]$response.headers.'Retry-After'
+                    if ($delay -le 0) { $delay = [int][Math]::Pow(2, $attempt + 1) }
+                    $retryAfter = [Math]::Max($retryAfter, $delay)
+                }
+            }
+        }
+        if ($retry.Count -gt 0) {
+            Start-Sleep -Seconds $retryAfter
+        }
+        $pending = $retry.ToArray()
+    }
+    return $responses
+}
 
 Write-Host "Starting Security Audit..." -ForegroundColor Cyan
 Write-Host ""
@@ -136,43 +160,71 @@ Write-Host ""
 # 1. Check MFA Status
 Write-Host "[1/7] Checking MFA status for all users..." -ForegroundColor Yellow
 
-$mfaReport = @()
-$users = Get-MgUser -All -Property Id,DisplayName,UserPrincipalName,AccountEnabled
+$users = Get-MgUser -All -PageSize 999 -Property Id,DisplayName,UserPrincipalName,AccountEnabled
+
+# Index users by id so later sections do not fetch them again
+$userIndex = @{}
+foreach ($u in $users) {
+    $userIndex[$u.Id] = $u
+}
 
-foreach ($user in $users) {
-    $authMethods = Get-MgUserAuthenticationMethod -UserId $user.Id
-    $hasMFA = $authMethods.Count -gt 1  # More than just password
+$authRequests = foreach ($user in $users) {
+    @{ id = $user.Id; method = 'GET'; url = "/users/$($user.Id)/authentication/methods" }
+}
+$authResponses = Invoke-GraphBatch -Requests $authRequests
+
+$usersWithoutMFA = 0
+$mfaUnknown = 0
+$mfaCsv = New-CsvWriter -Name "MFA_Status.csv" -Columns UserPrincipalName, DisplayName, AccountEnabled, MFAEnabled, AuthMethodsCount
+try {
+    foreach ($user in $users) {
+        $response = $authResponses[$user.Id]
+        if (-not $response -or $response.status -lt 200 -or $response.status -ge 300) {
+            # Lookup failed even after retries; do not report this as "no MFA"
+            $mfaUnknown++
+            Write-CsvRow -Writer $mfaCsv -Fields $user.UserPrincipalName, $user.DisplayName, $user.AccountEnabled, "Unknown (HTTP $($response.status))", ""
+            continue
+        }
 
-    $mfaReport += [PSCustomObject]@{
-        UserPrincipalName = $user.UserPrincipalName
-        DisplayName = $user.DisplayName
-        AccountEnabled = $user.AccountEnabled
-        MFAEnabled = $hasMFA
-        AuthMethodsCount = $authMethods.Count
+        $authMethods = $response.body.value
+        $authMethodsCount = if ($authMethods) { @($authMethods).Count } else { 0 }
+        $hasMFA = $authMethodsCount -gt 1  # More than just password
+        if (-not $hasMFA -and $user.AccountEnabled) {
+            $usersWithoutMFA++
+        }
+
+        Write-CsvRow -Writer $mfaCsv -Fields $user.UserPrincipalName, $user.DisplayName, $user.AccountEnabled, $hasMFA, $authMethodsCount
     }
+} finally {
+    $mfaCsv.Dispose()
 }
 
-$mfaReport | Export-Csv -Path "$reportPath/MFA_Status.csv" -NoTypeInformation
-$usersWithoutMFA = ($mfaReport | Where-Object { $_.MFAEnabled -eq $false -and $_.AccountEnabled -eq $true }).Count
 Write-Host "  Users without MFA: $usersWithoutMFA" -ForegroundColor $(if($usersWithoutMFA -gt 0){'Red'}else{'Green'})
+if ($mfaUnknown -gt 0) {
+    Write-Host "  Users with unknown MFA status (lookup failed): $mfaUnknown" -ForegroundColor Yellow
+}
 
 # 2. Check Admin Accounts
 Write-Host "[2/7] Auditing admin role assignments..." -ForegroundColor Yellow
 
-$adminRoles = Get-MgDirectoryRole -All
-$adminReport = @()
+$adminRoles = Get-MgDirectoryRole -All -Property Id,DisplayName
+$adminReport = [System.Collections.Generic.List[psobject]]::new()
 
 foreach ($role in $adminRoles) {
-    $members = Get-MgDirectoryRoleMember -DirectoryRoleId $role.Id
+    $members = Get-MgDirectoryRoleMember -DirectoryRoleId $role.Id -All -PageSize 999 -Property Id
     foreach ($member in $members) {
-        $user = Get-MgUser -UserId $member.Id -ErrorAction SilentlyContinue
+        if (-not $userIndex.ContainsKey($member.Id)) {
+            # Not in the user list (e.g. a service principal); look it up once
+            $userIndex[$member.Id] = Get-MgUser -UserId $member.Id -Property Id,DisplayName,UserPrincipalName,AccountEnabled -ErrorAction SilentlyContinue
+        }
+        $user = $userIndex[$member.Id]
         if ($user) {
-            $adminReport += [PSCustomObject]@{
+            [void]$adminReport.Add([PSCustomObject]@{
                 UserPrincipalName = $user.UserPrincipalName
                 DisplayName = $user.DisplayName
                 Role = $role.DisplayName
                 AccountEnabled = $user.AccountEnabled
-            }
+            })
         }
     }
 }
@@ -184,29 +236,34 @@ Write-Host "  Total admin assignments: $($adminReport.Count)" -ForegroundColor C
 Write-Host "[3/7] Identifying inactive users (90+ days)..." -ForegroundColor Yellow
 
 $inactiveDate = (Get-Date).AddDays(-90)
-$inactiveUsers = @()
-
-foreach ($user in $users) {
-    $signIns = Get-MgAuditLogSignIn -Filter "userId eq '$($user.Id)'" -Top 1
-    $lastSignIn = if ($signIns) { $signIns[0].CreatedDateTime } else { $null }
-
-    if ($lastSignIn -and $lastSignIn -lt $inactiveDate -and $user.AccountEnabled) {
-        $inactiveUsers += [PSCustomObject]@{
-            UserPrincipalName = $user.UserPrincipalName
-            DisplayName = $user.DisplayName
-            LastSignIn = $lastSignIn
-            DaysSinceSignIn = ((Get-Date) - $lastSignIn).Days
+$inactiveCount = 0
+
+# Let Graph filter on each user's last sign-in (signInActivity needs Entra ID P1).
+# signInActivity cannot be combined with other filters, so disabled accounts
+# are dropped here.
+$inactiveCutoff = $inactiveDate.ToUniversalTime().ToString("yyyy-MM-dd'T'HH:mm:ss'Z'")
+$staleUsers = Get-MgUser -All -PageSize 999 -Property Id,DisplayName,UserPrincipalName,AccountEnabled,SignInActivity `
+                         -Filter "signInActivity/lastSignInDateTime lt $inactiveCutoff"
+
+$inactiveCsv = New-CsvWriter -Name "Inactive_Users.csv" -Columns UserPrincipalName, DisplayName, LastSignIn, DaysSinceSignIn
+try {
+    foreach ($user in $staleUsers) {
+        if ($user.AccountEnabled) {
+            $lastSignIn = $user.SignInActivity.LastSignInDateTime
+            $inactiveCount++
+            Write-CsvRow -Writer $inactiveCsv -Fields $user.UserPrincipalName, $user.DisplayName, $lastSignIn, ((Get-Date) - $lastSignIn).Days
         }
     }
+} finally {
+    $inactiveCsv.Dispose()
 }
 
-$inactiveUsers | Export-Csv -Path "$reportPath/Inactive_Users.csv" -NoTypeInformation
-Write-Host "  Inactive users found: $($inactiveUsers.Count)" -ForegroundColor $(if($inactiveUsers.Count -gt 0){'Yellow'}else{'Green'})
+Write-Host "  Inactive users found: $inactiveCount" -ForegroundColor $(if($inactiveCount -gt 0){'Yellow'}else{'Green'})
 
 # 4. Check Guest Users
 Write-Host "[4/7] Reviewing guest user access..." -ForegroundColor Yellow
 
-$guestUsers = Get-MgUser -Filter "userType eq 'Guest'" -All
+$guestUsers = Get-MgUser -Filter "userType eq 'Guest'" -All -PageSize 999 -Property UserPrincipalName,DisplayName,AccountEnabled,CreatedDateTime
 $guestReport = $guestUsers | Select-Object UserPrincipalName, DisplayName, AccountEnabled, CreatedDateTime
 
 $guestReport | Export-Csv -Path "$reportPath/Guest_Users.csv" -NoTypeInformation
@@ -215,17 +272,17 @@ Write-Host "  Guest users: $($guestUsers.Count)" -ForegroundColor Cyan
 # 5. Check License Usage
 Write-Host "[5/7] Analyzing license allocation..." -ForegroundColor Yellow
 
-$licenses = Get-MgSubscribedSku
-$licenseReport = @()
+$licenses = Get-MgSubscribedSku -Property SkuPartNumber,PrepaidUnits,ConsumedUnits
+$licenseReport = [System.Collections.Generic.List[psobject]]::new()
 
 foreach ($license in $licenses) {
-    $licenseReport += [PSCustomObject]@{
+    [void]$licenseReport.Add([PSCustomObject]@{
         ProductName = $license.SkuPartNumber
         TotalLicenses = $license.PrepaidUnits.Enabled
         AssignedLicenses = $license.ConsumedUnits
         AvailableLicenses = $license.PrepaidUnits.Enabled - $license.ConsumedUnits
         UtilizationPercent = [math]::Round(($license.ConsumedUnits / $license.PrepaidUnits.Enabled) * 100, 2)
-    }
+    })
 }
 
 $licenseReport | Export-Csv -Path "$reportPath/License_Usage.csv" -NoTypeInformation
@@ -234,29 +291,29 @@ Write-Host "  License SKUs analyzed: $($licenses.Count)" -ForegroundColor Cyan
 # 6. Check Mailbox Permissions
 Write-Host "[6/7] Auditing mailbox delegations..." -ForegroundColor Yellow
 
-$mailboxes = Get-Mailbox -ResultSize Unlimited
-$delegationReport = @()
-
-foreach ($mailbox in $mailboxes) {
-    $permissions = Get-MailboxPermission -Identity $mailbox.Identity |
-                   Where-Object { $_.User -ne "NT AUTHORITY\SELF" -and $_.IsInherited -eq $false }
+$mailboxes = Get-EXOMailbox -ResultSize Unlimited -PropertySets Minimum
+$delegationCount = 0
+$delegationCsv = New-CsvWriter -Name "Mailbox_Delegations.csv" -Columns Mailbox, DelegatedTo, AccessRights
+try {
+    foreach ($mailbox in $mailboxes) {
+        $permissions = Get-EXOMailboxPermission -Identity $mailbox.UserPrincipalName |
+                       Where-Object { $_.User -ne "NT AUTHORITY\SELF" -and $_.IsInherited -eq $false }
 
-    foreach ($perm in $permissions) {
-        $delegationReport += [PSCustomObject]@{
-            Mailbox = $mailbox.UserPrincipalName
-            DelegatedTo = $perm.User
-            AccessRights = $perm.AccessRights -join ", "
+        foreach ($perm in $permissions) {
+            $delegationCount++
+            Write-CsvRow -Writer $delegationCsv -Fields $mailbox.UserPrincipalName, $perm.User, ($perm.AccessRights -join ", ")
         }
     }
+} finally {
+    $delegationCsv.Dispose()
 }
 
-$delegationReport | Export-Csv -Path "$reportPath/Mailbox_Delegations.csv" -NoTypeInformation
-Write-Host "  Delegated mailboxes: $($delegationReport.Count)" -ForegroundColor Cyan
+Write-Host "  Delegated mailboxes: $delegationCount" -ForegroundColor Cyan
 
 # 7. Check Conditional Access Policies
 Write-Host "[7/7] Reviewing Conditional Access policies..." -ForegroundColor Yellow
 
-$caPolicies = Get-MgIdentityConditionalAccessPolicy
+$caPolicies = Get-MgIdentityConditionalAccessPolicy -All -Property DisplayName,State,CreatedDateTime,Conditions,GrantControls
 $caReport = $caPolicies | Select-Object DisplayName, State, CreatedDateTime,
                                          @{N='IncludeUsers';E={$_.Conditions.Users.IncludeUsers -join '; '}},
                                          @{N='RequiresMFA';E={$_.GrantControls.BuiltInControls -contains 'mfa'}}
@@ -271,7 +328,10 @@ Write-Host ""
 Write-Host "Users:" -ForegroundColor Cyan
 Write-Host "  Total Users: $($users.Count)"
 Write-Host "  Users without MFA: $usersWithoutMFA $(if($usersWithoutMFA -gt 0){'⚠️'}else{'✓'})"
-Write-Host "  Inactive Users (90+ days): $($inactiveUsers.Count) $(if($inactiveUsers.Count -gt 0){'⚠️'}else{'✓'})"
+if ($mfaUnknown -gt 0) {
+    Write-Host "  Users with unknown MFA status: $mfaUnknown ⚠️"
+}
+Write-Host "  Inactive Users (90+ days): $inactiveCount $(if($inactiveCount -gt 0){'⚠️'}else{'✓'})"
 Write-Host "  Guest Users: $($guestUsers.Count)"
 Write-Host ""
 Write-Host "Administration:" -ForegroundColor Cyan
@@ -289,7 +349,7 @@ Write-Host "Recommended Actions:" -ForegroundColor Yellow
 if ($usersWithoutMFA -gt 0) {
     Write-Host "  1. Enable MFA for users without MFA"
 }
-if ($inactiveUsers.Count -gt 0) {
+if ($inactiveCount -gt 0) {
     Write-Host "  2. Review and disable inactive user accounts"
 }
 if ($guestUsers.Count -gt 10) {
@@ -300,20 +360,12 @@ if ($guestUsers.Count -gt 10) {
 Disconnect-MgGraph
 Disconnect-ExchangeOnline -Confirm:$false
 """
-        return script
 
-    def generate_bulk_license_assignment_script(self, users_csv_path: str, license_sku: str) -> str:
-        """
-        Generate script for bulk license assignment from CSV.
+# UTF-8 encoding of the audit script, for callers writing it to a file or socket
+SECURITY_AUDIT_SCRIPT_BYTES = SECURITY_AUDIT_SCRIPT.encode('utf-8')
 
-        Args:
-            users_csv_path: Path to CSV with user emails
-            license_sku: License SKU to assign
-
-        Returns:
-            PowerShell script
-        """
-        script = f"""<#
+# Bulk license assignment script (str.format template)
+BULK_LICENSE_SCRIPT = """<#
 .SYNOPSIS
     Bulk License Assignment from CSV
 
@@ -335,7 +387,7 @@ Connect-MgGraph -Scopes "User.ReadWrite.All", "Directory.ReadWrite.All"
 
 # Get license SKU ID
 $targetSku = "{license_sku}"
-$licenseSkuId = (Get-MgSubscribedSku -All | Where-Object {{$_.SkuPartNumber -eq $targetSku}}).SkuId
+$licenseSkuId = (Get-MgSubscribedSku -All -Property SkuId,SkuPartNumber | Where-Object {{$_.SkuPartNumber -eq $targetSku}}).SkuId
 
 if (-not $licenseSkuId) {{
     Write-Host "✗ License SKU not found: $targetSku" -ForegroundColor Red
@@ -346,6 +398,16 @@ Write-Host "License SKU found: $targetSku" -ForegroundColor Green
 Write-Host "SKU ID: $licenseSkuId" -ForegroundColor Cyan
 Write-Host ""
 
+# License assignment body, shared by every user
+$licenseParams = @{{
+    AddLicenses = @(
+        @{{
+            SkuId = $licenseSkuId
+        }}
+    )
+    RemoveLicenses = @()
+}}
+
 # Import users from CSV
 $users = Import-Csv -Path $CsvPath
 
@@ -357,44 +419,30 @@ if (-not $users) {{
 Write-Host "Found $($users.Count) users in CSV" -ForegroundColor Cyan
 Write-Host ""
 
-# Process each user
-$successCount = 0
-$errorCount = 0
-$results = @()
-
-foreach ($user in $users) {{
+# Process one user and return its result row
+$assignLicense = {{
+    param($user, $licenseSkuId, $licenseParams)
     $userEmail = $user.UserPrincipalName
 
     try {{
-        # Get user
-        $mgUser = Get-MgUser -UserId $userEmail -ErrorAction Stop
+        # Get user along with the licenses already assigned to them
+        $mgUser = Get-MgUser -UserId $userEmail -Property Id,AssignedLicenses -ErrorAction Stop
 
         # Check if user already has license
-        $currentLicenses = Get-MgUserLicenseDetail -UserId $mgUser.Id
-        if ($currentLicenses.SkuId -contains $licenseSkuId) {{
+        if ($mgUser.AssignedLicenses.SkuId -contains $licenseSkuId) {{
             Write-Host "  ⊘ $userEmail - Already has license" -ForegroundColor Yellow
-            $results += [PSCustomObject]@{{
+            return [PSCustomObject]@{{
                 UserPrincipalName = $userEmail
                 Status = "Skipped"
                 Message = "Already licensed"
             }}
-            continue
         }}
 
         # Assign license
-        $licenseParams = @{{
-            AddLicenses = @(
-                @{{
-                    SkuId = $licenseSkuId
-                }}
-            )
-        }}
-
-        Set-MgUserLicense -UserId $mgUser.Id -BodyParameter $licenseParams
+        Set-MgUserLicense -UserId $mgUser.Id -BodyParameter $licenseParams | Out-Null
         Write-Host "  ✓ $userEmail - License assigned successfully" -ForegroundColor Green
 
-        $successCount++
-        $results += [PSCustomObject]@{{
+        [PSCustomObject]@{{
             UserPrincipalName = $userEmail
             Status = "Success"
             Message = "License assigned"
@@ -402,8 +450,7 @@ foreach ($user in $users) {{
 
     }} catch {{
         Write-Host "  ✗ $userEmail - Error: $_" -ForegroundColor Red
-        $errorCount++
-        $results += [PSCustomObject]@{{
+        [PSCustomObject]@{{
             UserPrincipalName = $userEmail
             Status = "Failed"
             Message = $_.Exception.Message
@@ -411,6 +458,21 @@ foreach ($user in $users) {{
     }}
 }}
 
+# Process each user: in parallel on PowerShell 7+, serially on Windows PowerShell 5.1
+if ($PSVersionTable.PSVersion.Major -ge 7) {{
+    # Script blocks cannot be passed with $using:, so rebuild it from source
+    $assignLicenseSource = $assignLicense.ToString()
+    $results = @($users | ForEach-Object -ThrottleLimit 10 -Parallel {{
+        $assign = [scriptblock]::Create($using:assignLicenseSource)
+        & $assign $_ $using:licenseSkuId $using:licenseParams
+    }})
+}} else {{
+    $results = @(foreach ($user in $users) {{ & $assignLicense $user $licenseSkuId $licenseParams }})
+}}
+
+$successCount = @($results | Where-Object {{ $_.Status -eq "Success" }}).Count
+$errorCount = @($results | Where-Object {{ $_.Status -eq "Failed" }}).Count
+
 # Export results
 $resultsPath = "LicenseAssignment_Results_$(Get-Date -Format 'yyyyMMdd_HHmmss').csv"
 $results | Export-Csv -Path $resultsPath -NoTypeInformation
@@ -427,4 +489,188 @@ Write-Host "Results saved to: $resultsPath" -ForegroundColor Cyan
 # Disconnect
 Disconnect-MgGraph
 """
-        return script
+
+# Escapes for values interpolated into PowerShell double-quoted strings.
+# PowerShell also treats typographic double quotes as string delimiters.
+PS_STRING_ESCAPES = str.maketrans({
+    '`': '``',
+    '"': '`"',
+    '$': '`$',
+    '\u201c': '`\u201c',
+    '\u201d': '`\u201d',
+    '\u201e': '`\u201e',
+    '\n': '`n',
+    '\r': '`r',
+})
+
+
+def escape_ps_string(value: str) -> str:
+    """
+    Escape a value for a PowerShell double-quoted string. "#>" is broken up
+    as well, since some values are also echoed inside the comment-based help.
+
+    Args:
+        value: Raw value
+
+    Returns:
+        Escaped value
+    """
+    return value.translate(PS_STRING_ESCAPES).replace('#>', '#`>')
+
+
+@lru_cache(maxsize=128)
+def render_conditional_access_policy_script(
+    policy_name: str,
+    require_mfa: bool,
+    include_users: str,
+    exclude_users: Tuple[str, ...]
+) -> str:
+    """
+    Render the Conditional Access policy script. Cached, so repeated
+    requests for the same policy reuse the rendered script.
+
+    Args:
+        policy_name: Display name of the policy
+        require_mfa: Whether the policy grants access only with MFA
+        include_users: Users the policy applies to
+        exclude_users: Users excluded from the policy
+
+    Returns:
+        PowerShell script
+    """
+    exclude_block = ""
+    if exclude_users:
+        # Non-string entries are left for join() to reject with its usual error
+        exclude_list = '", "'.join(
+            escape_ps_string(user) if isinstance(user, str) else user for user in exclude_users
+        )
+        exclude_block = CA_EXCLUDE_USERS_BLOCK.format(exclude_list=exclude_list)
+
+    return CA_POLICY_SCRIPT.format(
+        policy_name=escape_ps_string(policy_name),
+        include_users=escape_ps_string(include_users),
+        exclude_block=exclude_block,
+        mfa_block=CA_MFA_BLOCK if require_mfa else "",
+    )
+
+
+@lru_cache(maxsize=128)
+def render_bulk_license_assignment_script(users_csv_path: str, license_sku: str) -> str:
+    """
+    Render the bulk license assignment script. Cached like
+    render_conditional_access_policy_script.
+
+    Args:
+        users_csv_path: Path to CSV with user emails
+        license_sku: License SKU to assign
+
+    Returns:
+        PowerShell script
+    """
+    return BULK_LICENSE_SCRIPT.format(
+        users_csv_path=escape_ps_string(users_csv_path),
+        license_sku=escape_ps_string(license_sku),
+    )
+
+
+class PowerShellScriptGenerator:
+    """Generate PowerShell scripts for common Microsoft 365 admin tasks."""
+
+    __slots__ = ('tenant_domain',)
+
+    def __init__(self, tenant_domain: str):
+        """
+        Initialize generator with tenant domain.
+
+        Args:
+            tenant_domain: Primary domain of the Microsoft 365 tenant
+        """
+        self.tenant_domain = tenant_domain
+
+    @staticmethod
+    def render(kind: str, **context: Any) -> str:
+        """
+        Generate a script by kind, for callers that pick the script at runtime.
+
+        Args:
+            kind: Script kind, a key of SCRIPT_GENERATORS
+            **context: Keyword arguments of the matching generate_* method
+
+        Returns:
+            PowerShell script
+
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        generator = SCRIPT_GENERATORS.get(kind)
+        if generator is None:
+            raise ValueError(f"Unknown script kind: {kind}")
+        return generator(**context)
+
+    @staticmethod
+    def generate_conditional_access_policy_script(policy_config: Dict[str, Any]) -> str:
+        """
+        Generate script to create Conditional Access policy.
+
+        Args:
+            policy_config: Policy configuration parameters
+
+        Returns:
+            PowerShell script
+        """
+        policy_name = policy_config.get('name', 'MFA Policy')
+        require_mfa = policy_config.get('require_mfa', True)
+        include_users = policy_config.get('include_users', 'All')
+        exclude_users = policy_config.get('exclude_users', [])
+
+        # Normalize to hashable arguments; str() renders exactly as format() would
+        args = (str(policy_name), bool(require_mfa), str(include_users), tuple(exclude_users or ()))
+        try:
+            hash(args)
+        except TypeError:
+            # Unhashable exclude entries cannot key the cache; render uncached
+            # so bad input fails exactly as it always has
+            return render_conditional_access_policy_script.__wrapped__(*args)
+        return render_conditional_access_policy_script(*args)
+
+    @staticmethod
+    def generate_security_audit_script() -> str:
+        """
+        Generate comprehensive security audit script.
+
+        Returns:
+            PowerShell script for security assessment
+        """
+        return SECURITY_AUDIT_SCRIPT
+
+    @staticmethod
+    def generate_security_audit_script_bytes() -> bytes:
+        """
+        Generate the security audit script already encoded as UTF-8.
+
+        Returns:
+            PowerShell script for security assessment, as UTF-8 bytes
+        """
+        return SECURITY_AUDIT_SCRIPT_BYTES
+
+    @staticmethod
+    def generate_bulk_license_assignment_script(users_csv_path: str, license_sku: str) -> str:
+        """
+        Generate script for bulk license assignment from CSV.
+
+        Args:
+            users_csv_path: Path to CSV with user emails
+            license_sku: License SKU to assign
+
+        Returns:
+            PowerShell script
+        """
+        return render_bulk_license_assignment_script(str(users_csv_path), str(license_sku))
+
+
+# Script kinds accepted by PowerShellScriptGenerator.render
+SCRIPT_GENERATORS: Dict[str, Callable[..., str]] = {
+    'conditional_access': PowerShellScriptGenerator.generate_conditional_access_policy_script,
+    'security_audit': PowerShellScriptGenerator.generate_security_audit_script,
+    'bulk_license': PowerShellScriptGenerator.generate_bulk_license_assignment_script,
+}
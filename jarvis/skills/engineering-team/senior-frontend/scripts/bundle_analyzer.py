@@ -9,16 +9,33 @@ Usage:
     python bundle_analyzer.py <project_dir>
     python bundle_analyzer.py . --json
     python bundle_analyzer.py /path/to/project --verbose
+    find . -name package.json -not -path "*/node_modules/*" -exec dirname {} \; | python bundle_analyzer.py --stdin-batch
+    python bundle_analyzer.py --server /tmp/bundle_analyzer.sock
+
+Batch and server modes keep one interpreter warm across many projects and emit
+one JSON object per line. Server requests are newline-delimited JSON objects of
+the form {"dir": "/path/to/project", "verbose": false}.
 """
 
 import argparse
 import json
 import os
 import re
+import socket
+import stat
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, is_dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Known heavy packages and their lighter alternatives
 HEAVY_PACKAGES = {
@@ -79,6 +96,8 @@ HEAVY_PACKAGES = {
     }
 }
 
+HEAVY_PACKAGE_NAMES = frozenset(HEAVY_PACKAGES)
+
 # Recommended optimizations by package
 PACKAGE_OPTIMIZATIONS = {
     "react-icons": "Import individual icons: import { FaHome } from 'react-icons/fa'",
@@ -97,19 +116,161 @@ DEV_ONLY_PACKAGES = [
     "autoprefixer", "sass", "less", "husky", "lint-staged"
 ]
 
+# State management libraries; more than one in a project is flagged
+STATE_LIBS = ("redux", "@reduxjs/toolkit", "mobx", "zustand", "jotai", "recoil", "valtio")
+STATE_LIB_NAMES = frozenset(STATE_LIBS)
+
+# Substring patterns above compiled into single alternations, so each package
+# name is matched in one C-level pass instead of a Python loop over patterns
+DEV_ONLY_PATTERN = re.compile("|".join(map(re.escape, DEV_ONLY_PACKAGES)))
+OPTIMIZATION_PATTERN = re.compile("|".join(map(re.escape, PACKAGE_OPTIMIZATIONS)))
+
+# Import anti-patterns, fused into one alternation so each file is scanned once.
+# Matched against raw bytes to skip decoding source files.
+IMPORT_PATTERN = re.compile(
+    rb"(?P<lodash_star>import\s+\*\s+as\s+\w+\s+from\s+['\"]lodash['\"])"
+    rb"|(?P<moment>import\s+moment\s+from\s+['\"]moment['\"])"
+    rb"|(?P<react_icons>import\s+\{\s*\w+(?:,\s*\w+){5,}\s*\}\s+from\s+['\"]react-icons)"
+)
+
+# Literals every IMPORT_PATTERN match must contain, used as a prefilter
+IMPORT_LITERALS = (b"lodash", b"moment", b"react-icons")
+
+IMPORT_MESSAGES = {
+    "lodash_star": "Avoid import * from lodash, use individual imports",
+    "moment": "Consider replacing moment with date-fns or dayjs",
+    "react_icons": "Import icons from specific icon sets (react-icons/fa)",
+}
+
+# Packages targeted by IMPORT_PATTERN; without them the source scan cannot match
+IMPORT_SCAN_PACKAGES = frozenset({"lodash", "moment", "react-icons"})
+
+# Imports sit at the top of a module, so only the head of each file is scanned
+MAX_SCAN_BYTES = 65536
+
+REPORT_BAR = "=" * 60
+
+# Minimum score for each grade above F, ascending; GRADES[i] pairs with bisect index i
+GRADE_THRESHOLDS = (60, 70, 80, 90)
+GRADES = "FDCBA"
+
+# Next.js config file names, in lookup priority order
+NEXT_CONFIG_NAMES = ("next.config.js", "next.config.mjs", "next.config.ts")
+
+# Tokens check_nextjs_config looks for, found in a single scan of the config
+CONFIG_TOKEN_PATTERN = re.compile(r"images|optimizePackageImports|transpilePackages|swc")
+CONFIG_TOKEN_COUNT = 4
+
+# Configs beyond this size are generated or minified; the tail is not inspected
+MAX_CONFIG_BYTES = 131072
+
+# Bound on cached config parses kept alive in batch/server mode
+CONFIG_CACHE_SIZE = 1024
+
+# Directories never worth descending into when scanning sources
+SKIP_DIRS = frozenset({"node_modules", ".next", "dist", "build", ".git"})
+
+SOURCE_EXTENSIONS = frozenset({".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"})
+
+# Import scan stops collecting once this many issues have been found
+MAX_IMPORT_ISSUES = 50
+
+# Below this many source files, process pool start-up costs more than it saves
+PARALLEL_SCAN_THRESHOLD = 200
+
+
+# Report records. Fixed-shape slotted dataclasses keep large issue lists compact;
+# they are converted to JSON objects only at serialization time.
+
+@dataclass
+class HeavyIssue:
+    __slots__ = ("package", "type", "size", "alternative", "reason")
+    package: str
+    type: str
+    size: str
+    alternative: str
+    reason: str
+
+
+@dataclass
+class PackageWarning:
+    __slots__ = ("package", "type", "message")
+    package: str
+    type: str
+    message: str
+
+
+@dataclass
+class StateLibsWarning:
+    __slots__ = ("packages", "type", "message")
+    packages: List[str]
+    type: str
+    message: str
+
+
+@dataclass
+class Optimization:
+    __slots__ = ("package", "tip")
+    package: str
+    tip: str
+
+
+@dataclass
+class ImportIssue:
+    __slots__ = ("file", "issue")
+    file: str
+    issue: str
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize report records for the stdlib json module."""
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default)
+
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _load_package_json_cached(path_str: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """Parse package.json; the stat fields key the cache so edits invalidate it."""
+    try:
+        with open(path_str, "rb") as f:
+            return _json_loads(f.read())
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _read_config_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Read a config file; the stat fields key the cache so edits invalidate it."""
+    with open(path_str, "rb") as f:
+        raw = f.read(MAX_CONFIG_BYTES)
+    return raw.decode("utf-8", errors="replace")
+
 
 def load_package_json(project_dir: Path) -> Optional[Dict]:
     """Load and parse package.json."""
     package_path = project_dir / "package.json"
-    if not package_path.exists():
-        return None
-
     try:
-        with open(package_path) as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        st = package_path.stat()
+    except OSError:
         return None
 
+    return _load_package_json_cached(str(package_path), st.st_mtime_ns, st.st_size)
+
 
 def analyze_dependencies(package_json: Dict) -> Dict:
     """Analyze dependencies for issues."""
@@ -119,93 +280,89 @@ def analyze_dependencies(package_json: Dict) -> Dict:
     issues = []
     warnings = []
     optimizations = []
+    dev_in_production_count = 0
 
-    # Check for heavy packages
+    # Check for heavy packages; most projects have none, so intersect first
+    heavy_found = HEAVY_PACKAGE_NAMES.intersection(deps)
     for pkg, info in HEAVY_PACKAGES.items():
-        if pkg in deps:
-            issues.append({
-                "package": pkg,
-                "type": "heavy_dependency",
-                "size": info["size"],
-                "alternative": info["alternative"],
-                "reason": info["reason"]
-            })
-
-    # Check for dev dependencies in production
-    for pkg in deps.keys():
-        for dev_pattern in DEV_ONLY_PACKAGES:
-            if dev_pattern in pkg:
-                warnings.append({
-                    "package": pkg,
-                    "type": "dev_in_production",
-                    "message": f"{pkg} should be in devDependencies, not dependencies"
-                })
-
-    # Check for optimization opportunities
-    for pkg in deps.keys():
-        for opt_pkg, opt_tip in PACKAGE_OPTIMIZATIONS.items():
-            if opt_pkg in pkg:
-                optimizations.append({
-                    "package": pkg,
-                    "tip": opt_tip
-                })
+        if pkg in heavy_found:
+            issues.append(HeavyIssue(pkg, "heavy_dependency", info["size"], info["alternative"], info["reason"]))
+
+    # Check for dev dependencies in production and optimization opportunities
+    for pkg in deps:
+        if DEV_ONLY_PATTERN.search(pkg):
+            dev_in_production_count += 1
+            warnings.append(PackageWarning(
+                pkg, "dev_in_production", f"{pkg} should be in devDependencies, not dependencies"
+            ))
+
+        match = OPTIMIZATION_PATTERN.search(pkg)
+        if match:
+            optimizations.append(Optimization(pkg, PACKAGE_OPTIMIZATIONS[match.group()]))
 
     # Check for outdated React patterns
     if "prop-types" in deps and ("typescript" in dev_deps or "@types/react" in dev_deps):
-        warnings.append({
-            "package": "prop-types",
-            "type": "redundant",
-            "message": "prop-types is redundant when using TypeScript"
-        })
+        warnings.append(PackageWarning(
+            "prop-types", "redundant", "prop-types is redundant when using TypeScript"
+        ))
 
     # Check for multiple state management libraries
-    state_libs = ["redux", "@reduxjs/toolkit", "mobx", "zustand", "jotai", "recoil", "valtio"]
-    found_state_libs = [lib for lib in state_libs if lib in deps]
-    if len(found_state_libs) > 1:
-        warnings.append({
-            "packages": found_state_libs,
-            "type": "multiple_state_libs",
-            "message": f"Multiple state management libraries found: {', '.join(found_state_libs)}"
-        })
+    state_found = STATE_LIB_NAMES.intersection(deps)
+    if len(state_found) > 1:
+        found_state_libs = [lib for lib in STATE_LIBS if lib in state_found]
+        warnings.append(StateLibsWarning(
+            found_state_libs,
+            "multiple_state_libs",
+            f"Multiple state management libraries found: {', '.join(found_state_libs)}"
+        ))
 
     return {
         "total_dependencies": len(deps),
         "total_dev_dependencies": len(dev_deps),
         "issues": issues,
         "warnings": warnings,
-        "optimizations": optimizations
+        "optimizations": optimizations,
+        # Internal; consumed by calculate_score and removed by run_once
+        "_dev_in_prod_count": dev_in_production_count
     }
 
 
 def check_nextjs_config(project_dir: Path) -> Dict:
     """Check Next.js configuration for optimizations."""
-    config_paths = [
-        project_dir / "next.config.js",
-        project_dir / "next.config.mjs",
-        project_dir / "next.config.ts"
-    ]
-
-    for config_path in config_paths:
-        if config_path.exists():
+    try:
+        with os.scandir(project_dir) as it:
+            entries = {entry.name: entry for entry in it if entry.name in NEXT_CONFIG_NAMES}
+    except OSError:
+        entries = {}
+
+    for name in NEXT_CONFIG_NAMES:
+        entry = entries.get(name)
+        if entry is not None:
             try:
-                content = config_path.read_text()
+                st = entry.stat()
+                content = _read_config_cached(entry.path, st.st_mtime_ns, st.st_size)
+                found = set()
+                for match in CONFIG_TOKEN_PATTERN.finditer(content):
+                    found.add(match.group())
+                    if len(found) == CONFIG_TOKEN_COUNT:
+                        break
                 suggestions = []
 
                 # Check for image optimization
-                if "images" not in content:
+                if "images" not in found:
                     suggestions.append("Configure images.remotePatterns for optimized image loading")
 
                 # Check for package optimization
-                if "optimizePackageImports" not in content:
+                if "optimizePackageImports" not in found:
                     suggestions.append("Add experimental.optimizePackageImports for lucide-react, @heroicons/react")
 
                 # Check for transpilePackages
-                if "transpilePackages" not in content and "swc" not in content:
+                if "transpilePackages" not in found and "swc" not in found:
                     suggestions.append("Consider transpilePackages for monorepo packages")
 
                 return {
                     "found": True,
-                    "path": str(config_path),
+                    "path": entry.path,
                     "suggestions": suggestions
                 }
             except Exception:
@@ -217,43 +374,87 @@ def check_nextjs_config(project_dir: Path) -> Dict:
     }
 
 
-def analyze_imports(project_dir: Path) -> Dict:
-    """Analyze import patterns in source files."""
+def _iter_source_files(root: Path):
+    """Yield paths of source files under root in a single directory walk."""
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    else:
+                        name = entry.name
+                        dot = name.rfind(".")
+                        if dot != -1 and name[dot:] in SOURCE_EXTENSIONS:
+                            yield entry.path
+                except OSError:
+                    continue
+
+
+def _scan_file(path_str: str) -> List[str]:
+    """Return the import issue messages found in a single source file."""
+    try:
+        with open(path_str, "rb") as f:
+            content = f.read(MAX_SCAN_BYTES)
+    except Exception:
+        return []
+
+    # Most files import none of the targeted modules; a C-level literal search
+    # rules them out without entering the regex engine
+    if not any(literal in content for literal in IMPORT_LITERALS):
+        return []
+
+    found = {match.lastgroup for match in IMPORT_PATTERN.finditer(content)}
+    return [message for key, message in IMPORT_MESSAGES.items() if key in found]
+
+
+def analyze_imports(project_dir: Path, max_issues: int = MAX_IMPORT_ISSUES) -> Dict:
+    """Analyze import patterns in source files, stopping after max_issues."""
     issues = []
     src_dirs = [project_dir / "src", project_dir / "app", project_dir / "pages"]
 
-    patterns_to_check = [
-        (r"import\s+\*\s+as\s+\w+\s+from\s+['\"]lodash['\"]", "Avoid import * from lodash, use individual imports"),
-        (r"import\s+moment\s+from\s+['\"]moment['\"]", "Consider replacing moment with date-fns or dayjs"),
-        (r"import\s+\{\s*\w+(?:,\s*\w+){5,}\s*\}\s+from\s+['\"]react-icons", "Import icons from specific icon sets (react-icons/fa)"),
-    ]
-
-    files_checked = 0
+    paths = []
     for src_dir in src_dirs:
         if not src_dir.exists():
             continue
+        paths.extend(_iter_source_files(src_dir))
 
-        for ext in ["*.ts", "*.tsx", "*.js", "*.jsx"]:
-            for file_path in src_dir.glob(f"**/{ext}"):
-                if "node_modules" in str(file_path):
-                    continue
-
-                files_checked += 1
-                try:
-                    content = file_path.read_text()
-                    for pattern, message in patterns_to_check:
-                        if re.search(pattern, content):
-                            issues.append({
-                                "file": str(file_path.relative_to(project_dir)),
-                                "issue": message
-                            })
-                except Exception:
-                    continue
+    executor = None
+    if len(paths) < PARALLEL_SCAN_THRESHOLD:
+        results = map(_scan_file, paths)
+    else:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        results = executor.map(_scan_file, paths, chunksize=64)
 
-    return {
+    files_checked = 0
+    truncated = False
+    try:
+        for path_str, messages in zip(paths, results):
+            files_checked += 1
+            for message in messages:
+                issues.append(ImportIssue(os.path.relpath(path_str, project_dir), message))
+            if len(issues) >= max_issues:
+                del issues[max_issues:]
+                truncated = True
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    result = {
         "files_checked": files_checked,
         "issues": issues
     }
+    if truncated:
+        result["truncated"] = True
+    return result
 
 
 def calculate_score(analysis: Dict) -> Tuple[int, str]:
@@ -264,8 +465,11 @@ def calculate_score(analysis: Dict) -> Tuple[int, str]:
     score -= len(analysis["dependencies"]["issues"]) * 10
 
     # Deduct for dev deps in production
-    score -= len([w for w in analysis["dependencies"]["warnings"]
-                  if w.get("type") == "dev_in_production"]) * 5
+    deps = analysis["dependencies"]
+    dev_in_prod = deps.get("_dev_in_prod_count")
+    if dev_in_prod is None:
+        dev_in_prod = sum(1 for w in deps["warnings"] if w.type == "dev_in_production")
+    score -= dev_in_prod * 5
 
     # Deduct for import issues
     score -= len(analysis.get("imports", {}).get("issues", [])) * 3
@@ -275,82 +479,167 @@ def calculate_score(analysis: Dict) -> Tuple[int, str]:
         score -= 10
 
     score = max(0, min(100, score))
-
-    if score >= 90:
-        grade = "A"
-    elif score >= 80:
-        grade = "B"
-    elif score >= 70:
-        grade = "C"
-    elif score >= 60:
-        grade = "D"
-    else:
-        grade = "F"
-
-    return score, grade
+    return score, GRADES[bisect_right(GRADE_THRESHOLDS, score)]
 
 
 def print_report(analysis: Dict) -> None:
     """Print human-readable report."""
-    score, grade = calculate_score(analysis)
+    if "score" in analysis:
+        score, grade = analysis["score"], analysis["grade"]
+    else:
+        score, grade = calculate_score(analysis)
+    out = []
 
-    print("=" * 60)
-    print("FRONTEND BUNDLE ANALYSIS REPORT")
-    print("=" * 60)
-    print(f"\nBundle Health Score: {score}/100 ({grade})")
+    out.append(REPORT_BAR)
+    out.append("FRONTEND BUNDLE ANALYSIS REPORT")
+    out.append(REPORT_BAR)
+    out.append(f"\nBundle Health Score: {score}/100 ({grade})")
 
     deps = analysis["dependencies"]
-    print(f"\nDependencies: {deps['total_dependencies']} production, {deps['total_dev_dependencies']} dev")
+    out.append(f"\nDependencies: {deps['total_dependencies']} production, {deps['total_dev_dependencies']} dev")
 
     # Heavy dependencies
     if deps["issues"]:
-        print("\n--- HEAVY DEPENDENCIES ---")
+        out.append("\n--- HEAVY DEPENDENCIES ---")
         for issue in deps["issues"]:
-            print(f"\n  {issue['package']} ({issue['size']})")
-            print(f"    Reason: {issue['reason']}")
-            print(f"    Alternative: {issue['alternative']}")
+            out.append(f"\n  {issue.package} ({issue.size})")
+            out.append(f"    Reason: {issue.reason}")
+            out.append(f"    Alternative: {issue.alternative}")
 
     # Warnings
     if deps["warnings"]:
-        print("\n--- WARNINGS ---")
+        out.append("\n--- WARNINGS ---")
         for warning in deps["warnings"]:
-            if "package" in warning:
-                print(f"  - {warning['package']}: {warning['message']}")
+            if isinstance(warning, PackageWarning):
+                out.append(f"  - {warning.package}: {warning.message}")
             else:
-                print(f"  - {warning['message']}")
+                out.append(f"  - {warning.message}")
 
     # Optimizations
     if deps["optimizations"]:
-        print("\n--- OPTIMIZATION TIPS ---")
+        out.append("\n--- OPTIMIZATION TIPS ---")
         for opt in deps["optimizations"]:
-            print(f"  - {opt['package']}: {opt['tip']}")
+            out.append(f"  - {opt.package}: {opt.tip}")
 
     # Next.js config
     if "nextjs" in analysis:
         nextjs = analysis["nextjs"]
         if nextjs.get("suggestions"):
-            print("\n--- NEXT.JS CONFIG ---")
+            out.append("\n--- NEXT.JS CONFIG ---")
             for suggestion in nextjs["suggestions"]:
-                print(f"  - {suggestion}")
+                out.append(f"  - {suggestion}")
 
     # Import issues
-    if analysis.get("imports", {}).get("issues"):
-        print("\n--- IMPORT ISSUES ---")
+    if analysis.get("imports", {}).get("skipped"):
+        out.append(f"\n{analysis['imports']['message']}")
+    elif analysis.get("imports", {}).get("issues"):
+        imports = analysis["imports"]
+        truncated = f" (truncated at {len(imports['issues'])})" if imports.get("truncated") else ""
+        out.append(f"\n--- IMPORT ISSUES ---{truncated}")
         for issue in analysis["imports"]["issues"][:10]:  # Limit to 10
-            print(f"  - {issue['file']}: {issue['issue']}")
+            out.append(f"  - {issue.file}: {issue.issue}")
 
     # Summary
-    print("\n--- RECOMMENDATIONS ---")
+    out.append("\n--- RECOMMENDATIONS ---")
     if score >= 90:
-        print("  Bundle is well-optimized!")
+        out.append("  Bundle is well-optimized!")
     elif deps["issues"]:
-        print("  1. Replace heavy dependencies with lighter alternatives")
+        out.append("  1. Replace heavy dependencies with lighter alternatives")
     if deps["warnings"]:
-        print("  2. Move dev-only packages to devDependencies")
+        out.append("  2. Move dev-only packages to devDependencies")
     if deps["optimizations"]:
-        print("  3. Apply import optimizations for tree-shaking")
+        out.append("  3. Apply import optimizations for tree-shaking")
+
+    out.append("\n" + REPORT_BAR)
+
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+def run_once(project_dir: Path, verbose: bool = False) -> Dict:
+    """Run the full analysis for a single project directory."""
+    if not project_dir.exists():
+        raise ValueError(f"Directory not found: {project_dir}")
+
+    package_json = load_package_json(project_dir)
+    if not package_json or not isinstance(package_json, dict):
+        raise ValueError("No valid package.json found")
+    for key in ("dependencies", "devDependencies"):
+        if not isinstance(package_json.get(key, {}), dict):
+            raise ValueError(f"Invalid package.json: {key} must be an object")
+
+    analysis = {
+        "project": str(project_dir),
+        "dependencies": analyze_dependencies(package_json),
+        "nextjs": check_nextjs_config(project_dir)
+    }
+
+    if verbose:
+        declared = package_json.get("dependencies", {}).keys() | package_json.get("devDependencies", {}).keys()
+        if IMPORT_SCAN_PACKAGES & declared:
+            analysis["imports"] = analyze_imports(project_dir)
+        else:
+            analysis["imports"] = {
+                "skipped": True,
+                "message": "Import scan skipped (no lodash/moment/react-icons in deps)"
+            }
+
+    analysis["score"], analysis["grade"] = calculate_score(analysis)
+    del analysis["dependencies"]["_dev_in_prod_count"]
+    return analysis
 
-    print("\n" + "=" * 60)
+
+def _run_safe(project_dir: Path, verbose: bool) -> Dict:
+    """Run analysis, reporting failures as an error record instead of exiting."""
+    try:
+        return run_once(project_dir.resolve(), verbose)
+    except (ValueError, OSError) as e:
+        return {"project": str(project_dir), "error": str(e)}
+    except Exception as e:
+        # One unexpected failure must not end a batch run or the server
+        return {"project": str(project_dir), "error": f"Analysis failed: {type(e).__name__}: {e}"}
+
+
+def run_batch(stream, verbose: bool) -> None:
+    """Analyze one project path per input line, printing one JSON result per line."""
+    for line in stream:
+        path = line.strip()
+        if path:
+            print(_json_dumps(_run_safe(Path(path), verbose)), flush=True)
+
+
+def serve(socket_path: str, verbose: bool) -> None:
+    """Answer newline-delimited JSON requests on a Unix domain socket."""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        # Only clear out a stale socket, never some other file at that path
+        if not stat.S_ISSOCK(mode):
+            raise ValueError(f"Not a socket, refusing to replace: {socket_path}")
+        os.unlink(socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen()
+        try:
+            while True:
+                conn, _ = server.accept()
+                try:
+                    with conn, conn.makefile("rwb") as stream:
+                        for line in stream:
+                            try:
+                                request = _json_loads(line)
+                                result = _run_safe(Path(request["dir"]), request.get("verbose", verbose))
+                            except Exception as e:
+                                result = {"error": f"Invalid request: {e}"}
+                            stream.write(_json_dumps(result).encode() + b"\n")
+                            stream.flush()
+                except Exception:
+                    # Client went away or the exchange broke; keep serving others
+                    continue
+        finally:
+            os.unlink(socket_path)
 
 
 def main():
@@ -371,34 +660,44 @@ def main():
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
-        help="Include detailed import analysis"
+        help="Include detailed import analysis (walks the source tree; "
+             "skipped when lodash, moment and react-icons are not dependencies)"
+    )
+    parser.add_argument(
+        "--stdin-batch",
+        action="store_true",
+        help="Read project directories from stdin, one per line, and print JSON lines"
+    )
+    parser.add_argument(
+        "--server",
+        metavar="SOCKET",
+        help="Serve JSON analysis requests on a Unix domain socket"
     )
 
     args = parser.parse_args()
-    project_dir = Path(args.project_dir).resolve()
 
-    if not project_dir.exists():
-        print(f"Error: Directory not found: {project_dir}", file=sys.stderr)
-        sys.exit(1)
+    if args.server:
+        try:
+            serve(args.server, args.verbose)
+        except KeyboardInterrupt:
+            pass
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
 
-    package_json = load_package_json(project_dir)
-    if not package_json:
-        print("Error: No valid package.json found", file=sys.stderr)
-        sys.exit(1)
+    if args.stdin_batch:
+        run_batch(sys.stdin, args.verbose)
+        return
 
-    analysis = {
-        "project": str(project_dir),
-        "dependencies": analyze_dependencies(package_json),
-        "nextjs": check_nextjs_config(project_dir)
-    }
-
-    if args.verbose:
-        analysis["imports"] = analyze_imports(project_dir)
-
-    analysis["score"], analysis["grade"] = calculate_score(analysis)
+    try:
+        analysis = run_once(Path(args.project_dir).resolve(), args.verbose)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
     if args.json:
-        print(json.dumps(analysis, indent=2))
+        sys.stdout.write(_json_dumps(analysis, indent=True) + "\n")
     else:
         print_report(analysis)
 
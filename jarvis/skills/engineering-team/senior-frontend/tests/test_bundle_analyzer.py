@@ -0,0 +1,88 @@
+"""
+Tests for bundle_analyzer's --stdin-batch and --server modes.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "bundle_analyzer.py"
+
+
+class LongRunningModesTest(unittest.TestCase):
+    """A bad project yields an error record; later projects still get analyzed."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.projects = {
+            "not_object": "[1, 2]",
+            "bad_deps": json.dumps({"dependencies": [1, 2]}),
+            "bad_dev_deps": json.dumps({"dependencies": {}, "devDependencies": "x"}),
+            "good": json.dumps({"dependencies": {"react": "^18.0.0", "moment": "^2.0.0"}}),
+        }
+        for name, content in self.projects.items():
+            (self.root / name).mkdir()
+            (self.root / name / "package.json").write_text(content)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assert_results(self, results):
+        self.assertEqual(len(results), len(self.projects))
+        *bad, good = results
+        for result in bad:
+            self.assertIn("error", result)
+        self.assertNotIn("error", good)
+        self.assertIn("score", good)
+        self.assertNotIn("_dev_in_prod_count", good["dependencies"])
+
+    def test_stdin_batch_continues_past_bad_projects(self):
+        paths = "".join(f"{self.root / name}\n" for name in self.projects)
+        proc = subprocess.run(
+            [sys.executable, str(SCRIPT), "--stdin-batch"],
+            input=paths, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assert_results([json.loads(line) for line in proc.stdout.splitlines()])
+
+    def test_server_survives_bad_projects(self):
+        socket_path = str(self.root / "analyzer.sock")
+        server = subprocess.Popen(
+            [sys.executable, str(SCRIPT), "--server", socket_path],
+            stderr=subprocess.PIPE
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while not os.path.exists(socket_path):
+                self.assertIsNone(server.poll(), "server exited during startup")
+                self.assertLess(time.monotonic(), deadline, "server did not start")
+                time.sleep(0.05)
+
+            results = []
+            for name in self.projects:
+                # One connection per request, so a crash shows up as a refused connect
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.settimeout(30)
+                    client.connect(socket_path)
+                    with client.makefile("rwb") as stream:
+                        stream.write(json.dumps({"dir": str(self.root / name)}).encode() + b"\n")
+                        stream.flush()
+                        results.append(json.loads(stream.readline()))
+
+            self.assert_results(results)
+            self.assertIsNone(server.poll())
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+            server.stderr.close()
+
+
+if __name__ == "__main__":
+    unittest.main()